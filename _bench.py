@@ -0,0 +1,256 @@
+# _bench.py
+# headless benchmark of the viewport pipeline, prints a JSON report to compare between commits
+#   python _bench.py [--turns 200] [--seed 0] [--zoom 0] [--biomes procedural_field procedural_dungeon] [--generation 10] [--memory 2000] [--output bench.json]
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# built-in
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import contextlib
+import tempfile
+
+# third-party
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+from PyQt5.QtCore import QT_VERSION_STR
+
+APP = QApplication.instance() or QApplication(sys.argv)
+
+# project
+from globals_variables import *
+from reality import Tile, Player, Zombie, Food
+from mapping import Map
+from game import Game_VIEWPORT
+
+BIOMES = ["default", "procedural_field", "procedural_road", "procedural_lake", "procedural_forest", "procedural_dungeon"]
+MOVES = [(0,-1), (0,1), (-1,0), (1,0)] # forward, backward, left, right in camera coordinates
+
+class BenchView(QGraphicsView, Game_VIEWPORT): # Game_VIEWPORT without the rest of the Game mixins
+    def __init__(self, map_obj, player):
+        QGraphicsView.__init__(self)
+        Game_VIEWPORT.__init__(self)
+        self.sprite_poll_timer.stop()
+        self.flag_performance_players = False
+        self.flag_performance_enemies = False
+        self.flag_performance_buldings = False
+        self.map = map_obj
+        self.player = player
+
+def Percentiles(samples):
+    """ return the summary in milliseconds of a list of durations in seconds """
+    if not samples: return {"count": 0}
+    S = sorted(samples)
+    pick = lambda q: S[min(len(S)-1, int(q*len(S)))]*1000.0
+    return {
+        "count": len(S),
+        "mean": sum(S)/len(S)*1000.0,
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": S[-1]*1000.0
+    }
+
+def Git_Commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def Biome_Coords(biome):
+    return (0,0,-1) if biome == "procedural_dungeon" else (0,0,0)
+
+def New_Bench_View(biome):
+    """ generate the map of the biome and place a player on the walkable tile nearest to the center """
+    map_obj = Map(filename = biome, coords = Biome_Coords(biome), b_generate = True)
+    player = Player(name = "Bench", b_generate_items = True)
+    cx, cy = map_obj.width//2, map_obj.height//2
+    for dx, dy in Generate_Square_Spiral_Traversal_Diffs(max(map_obj.width, map_obj.height)):
+        player.x, player.y = cx + dx, cy + dy
+        if map_obj.place_character(player): break
+    return BenchView(map_obj, player)
+
+def Scripted_Turn(view, rng):
+    """ move, rotate or get hurt, the same seed gives the same script """
+    roll = rng.random()
+    player = view.player
+    if roll < 0.70:
+        dx, dy = view.rotate_vector_for_movement(*rng.choice(MOVES))
+        old_x, old_y = player.x, player.y
+        if view.map.move_character(player, dx, dy):
+            view.dirty_tiles.add((old_x, old_y))
+            view.dirty_tiles.add((player.x, player.y))
+    elif roll < 0.85:
+        view.rotation = (view.rotation + rng.choice((90, 270))) % 360
+    else:
+        player.hp = max(1, player.hp - rng.randint(1, 10))
+        player.stamina = max(0, player.stamina - rng.randint(1, 20))
+        player.hunger = max(0, player.hunger - 1)
+
+def Run_Animation(view, timings):
+    positions = [ (view.player.x, view.player.y - i) for i in range(1, 5) ]
+    view.draw_animation_on_grid("bolt", positions)
+    view.animation_timer.stop()
+    while view.flag_is_animating:
+        t0 = time.perf_counter()
+        view.draw_next_frame()
+        timings.append(time.perf_counter() - t0)
+
+def Timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - t0)
+    return Percentiles(samples)
+
+def Bench_Serialization(view, repeat = 5):
+    """ save and load timings of the map and the player, files go to a temporary folder """
+    map_obj, player = view.map, view.player
+    map_dict, player_dict = map_obj.to_dict(), player.to_dict()
+    with tempfile.TemporaryDirectory() as folder:
+        map_file = os.path.join(folder, "map.json")
+        map_obj.Save_JSON(map_file)
+        return {
+            "map_to_dict": Timed(map_obj.to_dict, repeat),
+            "map_from_dict": Timed(lambda: Map().from_dict(map_dict), repeat),
+            "map_save_json": Timed(lambda: map_obj.Save_JSON(map_file), repeat),
+            "map_load_json": Timed(lambda: Map().Load_JSON(map_file), repeat),
+            "map_file_bytes": os.path.getsize(map_file),
+            "player_to_dict": Timed(player.to_dict, repeat*20),
+            "player_from_dict": Timed(lambda: Player().from_dict(player_dict), repeat*20)
+        }
+
+MEMORY_FACTORIES = {
+    "tile": lambda i: Tile(x = i, y = 0),
+    "enemy": lambda i: Zombie(name = "Zombie", x = i, y = 0),
+    "item": lambda i: Food(name = "bread", nutrition = 50)
+}
+
+def Bench_Memory(count, seed):
+    """ python bytes per instance of the tile, enemy and item classes, the class level data is allocated by a first instance before tracing """
+    report = {}
+    for name, factory in MEMORY_FACTORIES.items():
+        random.seed(seed)
+        factory(-1)
+        tracemalloc.start()
+        instances = [ factory(i) for i in range(count) ]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report[name] = {
+            "count": count,
+            "bytes_per_instance": current/count,
+            "has_dict": hasattr(instances[0], "__dict__")
+        }
+    return report 
+
+def Bench_Generation(biome, seed, repeat):
+    """ (percentiles of the generation timings of the biome with the seeds seed, seed+1, ..., tiles left materialized on the last map) """
+    samples, map_obj = [], None
+    for i in range(repeat):
+        random.seed(seed + i)
+        t0 = time.perf_counter()
+        map_obj = Map(filename = biome, coords = Biome_Coords(biome), b_generate = True)
+        samples.append(time.perf_counter() - t0)
+    return Percentiles(samples), map_obj.grid.count_materialized() if map_obj else None 
+
+def Bench_Biome(biome, turns, seed, zoom = 0, animation_every = 10, generation_repeat = 10):
+    random.seed(seed)
+    t0 = time.perf_counter()
+    view = New_Bench_View(biome)
+    generation = time.perf_counter() - t0
+    view.zoom_index = zoom
+    Tile.RENDER_CACHE.clear()
+    Tile.RENDER_CACHE.reset_stats()
+    Tile.LOD_ROW_CACHE.clear()
+    Tile.LOD_ROW_CACHE.reset_stats()
+    # first frame with cold render cache
+    t0 = time.perf_counter()
+    view.draw()
+    first_frame = time.perf_counter() - t0
+    # timed pass
+    rng = random.Random(seed)
+    timings = {"draw_grid": [], "draw_hud": [], "draw_next_frame": []}
+    for turn in range(turns):
+        Scripted_Turn(view, rng)
+        t0 = time.perf_counter()
+        view.draw_grid()
+        timings["draw_grid"].append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        view.draw_hud()
+        timings["draw_hud"].append(time.perf_counter() - t0)
+        if turn % animation_every == 0: Run_Animation(view, timings["draw_next_frame"])
+    render_cache = Tile.RENDER_CACHE.stats()
+    # allocation pass (python allocations only, pixmaps live in Qt memory)
+    tracemalloc.start()
+    allocations = []
+    for turn in range(turns):
+        Scripted_Turn(view, rng)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        view.draw()
+        current, peak = tracemalloc.get_traced_memory()
+        allocations.append((peak - before, current - before))
+    tracemalloc.stop()
+    generation_ms, materialized_tiles = Bench_Generation(biome, seed, generation_repeat)
+    return {
+        "generation_s": generation,
+        "generation_ms": generation_ms,
+        "materialized_tiles": materialized_tiles,
+        "first_frame_ms": first_frame*1000.0,
+        "timings_ms": { name: Percentiles(samples) for name, samples in timings.items() },
+        "alloc_peak_bytes_per_draw": max(a[0] for a in allocations) if allocations else 0,
+        "alloc_mean_peak_bytes_per_draw": sum(a[0] for a in allocations)/len(allocations) if allocations else 0,
+        "alloc_retained_bytes": sum(a[1] for a in allocations),
+        "serialization_ms": Bench_Serialization(view),
+        "scene_items": len(view.scene.items()),
+        "render_cache": render_cache,
+        "lod_row_cache": Tile.LOD_ROW_CACHE.stats(),
+        "sprites": Tile.SPRITES.stats()
+    }
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "headless benchmark of Game_VIEWPORT")
+    parser.add_argument("--turns", type = int, default = 200)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--zoom", type = int, default = 0, help = "zoom level, 0 is the full detail view")
+    parser.add_argument("--biomes", nargs = "*", default = BIOMES)
+    parser.add_argument("--generation", type = int, default = 10, help = "maps generated per biome for the generation timings")
+    parser.add_argument("--memory", type = int, default = 2000, help = "instances per class of the memory section, 0 skips it")
+    parser.add_argument("--output", default = None, help = "write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    Tile.SPRITES.blocking = True # no placeholders, measure the real composition
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr): Tile._load_sprites()
+    report = {
+        "commit": Git_Commit(),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "turns": args.turns,
+        "seed": args.seed,
+        "view": [VIEW_WIDTH_IN_TILES, VIEW_HEIGHT_IN_TILES],
+        "tile_size": TILE_SIZE,
+        "zoom": args.zoom,
+        "load_sprites_s": time.perf_counter() - t0,
+        "biomes": {}
+    }
+    if args.memory > 0:
+        with contextlib.redirect_stdout(sys.stderr): report["memory"] = Bench_Memory(args.memory, args.seed)
+    for biome in args.biomes:
+        print(f"bench {biome}", file = sys.stderr)
+        with contextlib.redirect_stdout(sys.stderr): # the game logs to stdout 
+            report["biomes"][biome] = Bench_Biome(biome, args.turns, args.seed, zoom = args.zoom, generation_repeat = args.generation)
+    text = json.dumps(report, indent = 4)
+    if args.output:
+        with open(args.output, "w") as f: f.write(text)
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
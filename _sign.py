@@ -74,7 +74,6 @@ class Game_SOUNDMANAGER:
 class Game_VIEWPORT:
     def __init__(self): ...
     def draw(self): ...
-    def get_tiles_to_draw(self): ...
     def is_ingrid(self, x, y): ...
     def is_inview(self, x, y): ...
     def get_anchor(self): ...
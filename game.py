@@ -105,85 +105,174 @@ class Game_SOUNDMANAGER:
 
 # [ Game_VIEWPORT.draw ] { Game_VIEWPORT }
 # -> Game_VIEWPORT.draw() || .draw_grid() | .draw_hud()
-# -> Game_VIEWPORT.draw() || .draw_grid() || { .get_tiles_to_draw() | get_anchor() | .rotate_vector_for_camera() | .is_ingrid() | .is_inview() }
+# -> Game_VIEWPORT.draw() || .draw_grid() || .draw_tiles() || { .get_view_offsets() | .is_ingrid() | Tile.render() | .set_slot_pixmap() }
+# -> Game_VIEWPORT.draw() || .draw_grid() || .draw_lod() || { .get_view_offsets() | Tile.get_lod_key() | Tile.render_lod_row() }
 class Game_VIEWPORT:
+    @property
+    def grid_width(self):
+        """ size of the current map, MAP_WIDTH x MAP_HEIGHT before the first map """
+        map_obj = getattr(self, "map", None)
+        return map_obj.width if map_obj else MAP_WIDTH 
+    @property
+    def grid_height(self):
+        map_obj = getattr(self, "map", None)
+        return map_obj.height if map_obj else MAP_HEIGHT 
     def __init__(self):
         self.scene = QGraphicsScene()
         self.setScene(self.scene)
         self.scene.setBackgroundBrush(QBrush(QColor(0, 0, 0)))
         # -- 
         self.rotation = 0  # degrees: 0, 90, 180, 270
-        self.grid_width = MAP_WIDTH
-        self.grid_height = MAP_HEIGHT
         self.view_width = VIEW_WIDTH_IN_TILES
         self.view_height = VIEW_HEIGHT_IN_TILES
         self.tile_size = TILE_SIZE 
         # -- 
         self.dirty_tiles = set()  # Track tiles that need redrawing
-        self.tile_items = {}  # For optimized rendering
+        self.tile_items = {}  # (slot_x, slot_y) -> QGraphicsPixmapItem, one persistent item per screen slot 
+        self.tile_item_keys = {} # (slot_x, slot_y) -> cacheKey of the pixmap currently shown by the slot item 
+        self.view_offset_tables = {} # (rotation, view_width, view_height, anchor) -> [ ((world_dx, world_dy), (slot_x, slot_y)) ] 
+        self.zoom_tile_sizes = (TILE_SIZE,) + tuple(LOD_TILE_SIZES) # pixel size of a tile per zoom level, 0 is the full detail view 
+        self.zoom_index = 0 
+        self.lod_row_items = {} # screen row -> QGraphicsPixmapItem of the zoomed out view 
+        self.lod_row_keys = {} # screen row -> lod keys of the tiles currently shown by the row item 
+        self.hud_items = {} # name -> persistent hud item, created on first use 
+        self.hud_state = {} # name -> inputs the hud item was last drawn with 
+        self.hud_arrow_pixmaps = {} # rotation -> scaled and rotated north arrow 
+        self.hud_icon_pixmaps = {} # sprite key -> scaled weapon icon 
+        self.empty_slot_pixmap = QPixmap(TILE_SIZE, TILE_SIZE)
+        self.empty_slot_pixmap.fill(Qt.transparent)
         # --
         self.flag_is_animating = False
-        # -- 
-        Tile._load_sprites()
+        self.animation_item = None # overlay moved by draw_next_frame, created on first use 
+        # -- sprites are loaded on first access, the timer redraws when background loads finish 
+        self.sprite_poll_timer = QTimer()
+        self.sprite_poll_timer.timeout.connect(self.on_sprite_poll)
+        self.sprite_poll_timer.start(SPRITE_POLL_INTERVAL)
+    def on_sprite_poll(self):
+        if not Tile.SPRITES.poll(): return 
+        self.hud_arrow_pixmaps.clear()
+        self.hud_icon_pixmaps.clear()
+        self.hud_state.clear()
+        self.lod_row_keys.clear()
+        if getattr(self, "player", None) and getattr(self, "map", None): self.draw()
+        # the windows made their pixmaps once, with the placeholder of the sprites which were still loading 
+        for window in (getattr(self, "journal_window", None), getattr(self, "party_window", None)):
+            if window: window.update_char_button_images()
+        inventory_window = getattr(self, "inventory_window", None)
+        if inventory_window: inventory_window.update_selected_item_label_content()
     def draw(self):
         self.draw_grid()
         self.draw_hud()
-    def get_tiles_to_draw(self):
-        safety_draw_dy = 1
-        # view range : controls the tiles to draw 
-        # view measures : the size of viewport 
-        if not self.dirty_tiles: return [(x, y) for y in range(self.grid_height) for x in range(self.grid_width)]
-        # -- 
-        tiles_to_draw = set(self.dirty_tiles)  # Start with dirty tiles (includes MoveEvent old positions)
+    def clear_scene(self):
+        """ remove every item from the scene, the slot items are recreated on the next draw (use on map transitions) """
+        self.scene.clear()
+        self.tile_items.clear()
+        self.tile_item_keys.clear()
+        self.hud_items.clear()
+        self.hud_state.clear()
+        self.animation_item = None
+        self.lod_row_items.clear()
+        self.lod_row_keys.clear()
+    def get_slot_item(self, slot):
+        item = self.tile_items.get(slot, None)
+        if item is None:
+            item = QGraphicsPixmapItem()
+            item.setPos(slot[0]*self.tile_size, slot[1]*self.tile_size)
+            item.setZValue(0)
+            self.scene.addItem(item)
+            self.tile_items[slot] = item
+        return item
+    def set_slot_pixmap(self, slot, pixmap):
+        item = self.get_slot_item(slot)
+        key = pixmap.cacheKey()
+        if self.tile_item_keys.get(slot, None) == key: return 
+        item.setPixmap(pixmap)
+        self.tile_item_keys[slot] = key
+    def draw_tiles(self, ent_x = None, ent_y = None, extra_pixmap = None, extra_key = None):
+        """ update the slot items with the tiles under the viewport, the tile at (ent_x, ent_y) receives the extra_pixmap """
         px, py = self.player.x, self.player.y
-        view_range_x = range(-self.view_width // 2, self.view_width // 2 + 1)  # -3 to 3
-        view_range_y = range(-self.view_height // 2 - 1 - safety_draw_dy , self.view_height // 2)  # -4 to 2, adjusted for anchor
-        for dy in view_range_y:
-            for dx in view_range_x:
-                # Reverse rotation to get world coordinates
-                if self.rotation == 0:
-                    wx, wy = dx, dy
-                elif self.rotation == 90:
-                    wx, wy = -dy, dx
-                elif self.rotation == 180:
-                    wx, wy = -dx, -dy
-                elif self.rotation == 270:
-                    wx, wy = dy, -dx
-                x, y = px + wx, py + wy
-                if self.is_ingrid(x,y): tiles_to_draw.add((x, y))
-        return list(tiles_to_draw)
+        for (wx, wy), slot in self.get_view_offsets():
+            x, y = px + wx, py + wy
+            tile = self.map.get_tile(x, y) if self.is_ingrid(x,y) else None
+            if not tile: 
+                self.set_slot_pixmap(slot, self.empty_slot_pixmap) # slots outside of the map 
+            elif ent_x == x and ent_y == y:
+                self.set_slot_pixmap(slot, tile.render(extra_pixmap = extra_pixmap, game_instance = self, extra_key = extra_key))
+            else:
+                self.set_slot_pixmap(slot, tile.render(game_instance = self))
+        self.scene.setSceneRect(0, 0, self.view_width * self.tile_size, self.view_height * self.tile_size)
+    def get_view_offsets(self, rotation = None, view_width = None, view_height = None, anchor = None):
+        """ return [ ((world_dx, world_dy), (slot_x, slot_y)) ] for every screen slot (row by row), offsets are relative to the player at the anchor slot, cached per rotation, view size and anchor """
+        if rotation is None: rotation = self.rotation
+        if view_width is None: view_width = self.view_width
+        if view_height is None: view_height = self.view_height
+        if anchor is None: anchor = (self.get_anchor()[0] // self.tile_size, self.get_anchor()[1] // self.tile_size)
+        key = (rotation, view_width, view_height, anchor)
+        table = self.view_offset_tables.get(key, None)
+        if table is None:
+            anchor_x, anchor_y = anchor
+            table = []
+            for sy in range(view_height):
+                for sx in range(view_width):
+                    rx, ry = sx - anchor_x, sy - anchor_y
+                    # reverse of rotate_vector_for_camera 
+                    if rotation == 0:
+                        wx, wy = rx, ry
+                    elif rotation == 90:
+                        wx, wy = -ry, rx
+                    elif rotation == 180:
+                        wx, wy = -rx, -ry
+                    elif rotation == 270:
+                        wx, wy = ry, -rx
+                    table.append( ((wx, wy), (sx, sy)) )
+            self.view_offset_tables[key] = table
+        return table
     def is_ingrid(self,x,y):
         return (0 <= x < self.grid_width and 0 <= y < self.grid_height)
     def is_inview(self,x,y):
         return (0 <= x < self.view_width * self.tile_size and 0 <= y < self.view_height * self.tile_size)
     def get_anchor(self):
         return (self.view_width // 2) * self.tile_size, (self.view_height - 2) * self.tile_size
+    def get_animation_item(self):
+        """ return the overlay item moved over the static tiles by the animations """
+        if self.animation_item is None:
+            self.animation_item = QGraphicsPixmapItem()
+            self.animation_item.setZValue(5)
+            self.animation_item.setVisible(False)
+            self.scene.addItem(self.animation_item)
+        return self.animation_item
+    def get_screen_slot(self, x, y):
+        """ return the screen slot of the world tile (x, y) or None if it is outside of the view """
+        dx, dy = x - self.player.x, y - self.player.y
+        rx, ry = self.rotate_vector_for_camera(dx, dy)
+        anchor_screen_x, anchor_screen_y = self.get_anchor()
+        screen_x = anchor_screen_x + (rx) * self.tile_size
+        screen_y = anchor_screen_y + (ry) * self.tile_size
+        if not self.is_inview(screen_x, screen_y): return None 
+        return (screen_x // self.tile_size, screen_y // self.tile_size)
     def draw_next_frame(self):
+        """ move the animation overlay to the next position, the tiles under it are left untouched """
+        item = self.get_animation_item()
         if self.animation_index > len(self.animation_positions):
             self.animation_timer.stop()
+            item.setVisible(False)
             self.draw()
             self.flag_is_animating = False  # <<< UNBLOCK INPUT
             return
-        ent_x, ent_y = None, None     
+        if self.animation_index == 0:
+            self.draw_grid() # static scene under the overlay, drawn once per animation 
+        # fetched on every frame, the sprite may still be the placeholder of a lazy load when the animation starts 
+        pixmap = Tile.get_rotated_sprite(key = self.animation_sprite_key, rotation=self.animation_sprite_rotation)
+        if pixmap.cacheKey() != item.pixmap().cacheKey(): item.setPixmap(pixmap)
+        slot = None 
         if self.animation_index != len(self.animation_positions):
             ent_x, ent_y = self.animation_positions[self.animation_index]
-        self.scene.clear()
-        px, py = self.player.x, self.player.y
-        anchor_screen_x, anchor_screen_y = self.get_anchor()
-        tiles_to_draw = self.get_tiles_to_draw()
-        for x, y in tiles_to_draw:
-            dx, dy = x - px, y - py
-            rx, ry = self.rotate_vector_for_camera(dx, dy)
-            screen_x = anchor_screen_x + (rx) * self.tile_size
-            screen_y = anchor_screen_y + (ry) * self.tile_size
-            if self.is_ingrid(x, y) and self.is_inview(screen_x, screen_y):
-                tile = self.map.get_tile(x, y)
-                if tile:
-                    if ent_x == x and ent_y == y:
-                        tile.draw( self.scene, screen_x, screen_y, extra_pixmap = Tile.get_rotated_sprite(key = self.animation_sprite_key, rotation=self.animation_sprite_rotation), game_instance = self )
-                    else:
-                        tile.draw( self.scene, screen_x, screen_y, game_instance = self)
-        self.scene.setSceneRect(0, 0, self.view_width * self.tile_size, self.view_height * self.tile_size)
+            if self.is_ingrid(ent_x, ent_y): slot = self.get_screen_slot(ent_x, ent_y)
+        if slot is None or self.is_zoomed_out():
+            item.setVisible(False)
+        else:
+            item.setPos(slot[0]*self.tile_size, slot[1]*self.tile_size)
+            item.setVisible(True)
         self.animation_index += 1
     def _get_diff(self, v2, v1): #  v2 - v1
         return (v2[0]-v1[0], v2[1]-v1[1])
@@ -204,22 +293,97 @@ class Game_VIEWPORT:
         else:
             self.animation_timer.start(15)  # 1000ms = 1s per frame
     def draw_grid(self):
-        self.scene.clear()
-        tiles_to_draw = self.get_tiles_to_draw()
-        # -- 
-        px, py = self.player.x, self.player.y
-        anchor_screen_x, anchor_screen_y = self.get_anchor()
-        for x, y in tiles_to_draw:
-            dx, dy = x - px, y - py
-            rx, ry = self.rotate_vector_for_camera(dx, dy)
-            screen_x = anchor_screen_x + (rx) * self.tile_size
-            screen_y = anchor_screen_y + (ry) * self.tile_size
-            if self.is_ingrid(x,y) and self.is_inview(screen_x, screen_y):
-                tile = self.map.get_tile(x, y)
-                if tile: tile.draw(self.scene, screen_x, screen_y, game_instance = self)
-        self.scene.setSceneRect(0, 0, self.view_width * self.tile_size, self.view_height * self.tile_size)
+        if self.is_zoomed_out():
+            self.draw_lod()
+        else:
+            self.draw_tiles()
         self.dirty_tiles.clear() 
+    def is_zoomed_out(self):
+        return self.zoom_index > 0
+    def get_view_tile_size(self):
+        """ pixel size of a tile at the current zoom level """
+        return self.zoom_tile_sizes[self.zoom_index]
+    def get_lod_dimensions(self):
+        """ return (columns, rows) of tiles fitting the viewport at the current zoom level """
+        size = self.get_view_tile_size()
+        return (self.view_width * self.tile_size) // size, (self.view_height * self.tile_size) // size
+    def get_lod_anchor(self):
+        """ pixel position of the player slot in the zoomed out view, the player is centered """
+        size = self.get_view_tile_size()
+        cols, rows = self.get_lod_dimensions()
+        return (cols // 2) * size, (rows // 2) * size
+    def get_lod_center(self):
+        """ world tile drawn at the lod anchor, the map center when the whole map fits in the view, the player otherwise """
+        cols, rows = self.get_lod_dimensions()
+        if min(cols, rows) >= max(self.grid_width, self.grid_height): return self.grid_width // 2, self.grid_height // 2
+        return self.player.x, self.player.y
+    def set_zoom(self, zoom_index):
+        zoom_index = max(0, min(zoom_index, len(self.zoom_tile_sizes) - 1))
+        if zoom_index == self.zoom_index: return 
+        self.zoom_index = zoom_index
+        self.clear_scene()
+        self.draw()
+    def cycle_zoom(self):
+        self.set_zoom( (self.zoom_index + 1) % len(self.zoom_tile_sizes) )
+    def get_lod_row_item(self, row, size):
+        item = self.lod_row_items.get(row, None)
+        if item is None:
+            item = QGraphicsPixmapItem()
+            item.setPos(0, row * size)
+            item.setZValue(0)
+            self.scene.addItem(item)
+            self.lod_row_items[row] = item
+        return item
+    def draw_lod(self):
+        """ zoomed out view : terrain thumbnails without items or hp bars, each screen row is a single pixmap only replaced when its tiles change """
+        size = self.get_view_tile_size()
+        cols, rows = self.get_lod_dimensions()
+        anchor_x, anchor_y = self.get_lod_anchor()
+        table = self.get_view_offsets(self.rotation, cols, rows, (anchor_x // size, anchor_y // size))
+        px, py = self.get_lod_center()
+        lod_key = self.map.grid.get_lod_key # without materializing the terrain tiles 
+        for sy in range(rows):
+            keys = tuple( lod_key(px + wx, py + wy) for (wx, wy), _ in table[sy*cols:(sy+1)*cols] )
+            if self.lod_row_keys.get(sy, None) == keys: continue 
+            self.lod_row_keys[sy] = keys
+            self.get_lod_row_item(sy, size).setPixmap(Tile.render_lod_row(keys, size))
+        self.scene.setSceneRect(0, 0, self.view_width * self.tile_size, self.view_height * self.tile_size)
+    def get_hud_item(self, name, factory):
+        """ return the persistent hud item called name, created once with factory() and added to the scene """
+        item = self.hud_items.get(name)
+        if item is None:
+            item = factory()
+            item.setZValue(10)
+            self.scene.addItem(item)
+            self.hud_items[name] = item
+        return item
+    def hud_changed(self, name, state):
+        """ return True (and remember the new state) if the inputs of the hud element name changed since the last draw """
+        if self.hud_state.get(name, None) == state: return False
+        self.hud_state[name] = state
+        return True
+    def get_hud_arrow_pixmap(self, rotation):
+        """ return the north arrow scaled and rotated to point north for the camera rotation, cached per rotation """
+        pixmap = self.hud_arrow_pixmaps.get(rotation)
+        if pixmap is None:
+            arrow_sprite = Tile.SPRITES.get("HUD_arrow", QPixmap())  # Get arrow sprite
+            if arrow_sprite.isNull(): return arrow_sprite
+            arrow_size = 50  # Target size for scaling
+            arrow_scaled = arrow_sprite.scaled(arrow_size, arrow_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            # Rotate to point north (opposite of player rotation)
+            pixmap = arrow_scaled.transformed(QTransform().rotate(-rotation), Qt.SmoothTransformation)
+            self.hud_arrow_pixmaps[rotation] = pixmap
+        return pixmap
+    def get_hud_icon_pixmap(self, item):
+        """ return the item sprite scaled to the hud weapon icon size, cached per sprite key """
+        pixmap = self.hud_icon_pixmaps.get(item.sprite)
+        if pixmap is None:
+            wp_img_scale = int(math.floor( TILE_SIZE/1.5 ))
+            pixmap = item.get_sprite().scaled(wp_img_scale, wp_img_scale, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.hud_icon_pixmaps[item.sprite] = pixmap
+        return pixmap
     def draw_hud(self):
+        """ update the persistent hud items, each element is only touched when its inputs changed """
         oppacity = 180
         hud_width = self.view_width * self.tile_size
         hud_height = 50
@@ -228,67 +392,53 @@ class Game_VIEWPORT:
         bar_height = 10
         padding = 5
         # position label 
-        pos_label = QGraphicsTextItem(f"{self.player.x}, {self.map.height - self.player.y}")
-        pos_label.setDefaultTextColor(QColor("yellow"))  # White text
-        pos_label_width = pos_label.boundingRect().width()
-        pos_label.setPos(self.view_width*self.tile_size- pos_label_width - 10, 10)
-        pos_label.setZValue(10) 
-        self.scene.addItem(pos_label)
-        # HP Bar (Red)
-        hp_ratio = self.player.hp / self.player.max_hp
-        hp_bar = QGraphicsRectItem(10, hud_y + padding, bar_width * hp_ratio, bar_height)
-        hp_bar.setBrush(QColor(255,0,0,oppacity))
-        if hp_ratio<0.8: self.scene.addItem(hp_bar)
-        # Stamina Bar (Blue)
-        stamina_ratio = self.player.stamina / self.player.max_stamina
-        stamina_bar = QGraphicsRectItem(10 + bar_width + padding, hud_y + padding, bar_width * stamina_ratio, bar_height)
-        stamina_bar.setBrush(QColor(0,0,255,oppacity))
-        if stamina_ratio<0.8: self.scene.addItem(stamina_bar)
-        # Hunger Bar (Yellow)
-        hunger_ratio = self.player.hunger / self.player.max_hunger
-        hunger_bar = QGraphicsRectItem(10 + 2 * (bar_width + padding), hud_y + padding, bar_width * hunger_ratio, bar_height)
-        hunger_bar.setBrush(QColor(255,255,0,oppacity))
-        if hunger_ratio<0.8: self.scene.addItem(hunger_bar)
+        pos_text = f"{self.player.x}, {self.map.height - self.player.y}"
+        if self.hud_changed("pos_label", pos_text):
+            pos_label = self.get_hud_item("pos_label", QGraphicsTextItem)
+            pos_label.setDefaultTextColor(QColor("yellow"))
+            pos_label.setPlainText(pos_text)
+            pos_label_width = pos_label.boundingRect().width()
+            pos_label.setPos(self.view_width*self.tile_size- pos_label_width - 10, 10)
+        # HP Bar (Red), Stamina Bar (Blue), Hunger Bar (Yellow) 
+        bars = (
+            ("hp_bar", self.player.hp / self.player.max_hp, QColor(255,0,0,oppacity)),
+            ("stamina_bar", self.player.stamina / self.player.max_stamina, QColor(0,0,255,oppacity)),
+            ("hunger_bar", self.player.hunger / self.player.max_hunger, QColor(255,255,0,oppacity))
+        )
+        for i, (name, ratio, color) in enumerate(bars):
+            visible = ratio<0.8
+            width = int(bar_width * ratio) if visible else 0
+            if not self.hud_changed(name, (visible, width)): continue
+            bar = self.get_hud_item(name, QGraphicsRectItem)
+            bar.setBrush(color)
+            bar.setRect(10 + i * (bar_width + padding), hud_y + padding, width, bar_height)
+            bar.setVisible(visible)
         # North Arrow
-        arrow_size = 50  # Target size for scaling
-        arrow_x = hud_width / 2  # Desired center x-coordinate (middle of HUD)
-        arrow_y = 30  # Desired center y-coordinate
-        arrow_sprite = Tile.SPRITES.get("HUD_arrow", QPixmap())  # Get arrow sprite
-        if not arrow_sprite.isNull():
-            arrow_scaled = arrow_sprite.scaled(arrow_size, arrow_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            arrow_item = QGraphicsPixmapItem(arrow_scaled)
-            # Rotate to point north (opposite of player rotation)
-            rotation_angle = -self.rotation
-            transform = QTransform().rotate(rotation_angle)
-            arrow_item.setTransform(transform)
-            # Calculate the center of the pixmap
-            center_x = arrow_scaled.width() / 2
-            center_y = arrow_scaled.height() / 2
-            # Convert rotation angle to radians
-            theta = math.radians(rotation_angle)
-            # Calculate the offset of the center after rotation
-            offset_x = center_x * math.cos(theta) - center_y * math.sin(theta)
-            offset_y = center_x * math.sin(theta) + center_y * math.cos(theta)
-            # Adjust position so the center of the pixmap is at (arrow_x, arrow_y)
-            adjusted_x = arrow_x - center_x - (center_x * (math.cos(theta) - 1) - center_y * math.sin(theta))
-            adjusted_y = arrow_y - center_y - (center_x * math.sin(theta) + center_y * (math.cos(theta) - 1))
-            arrow_item.setPos(adjusted_x, adjusted_y)
-            self.scene.addItem(arrow_item)
-        else:
-            print("Warning: Arrow sprite not found")
-        # primary hand item 
+        if self.hud_changed("arrow", self.rotation):
+            arrow_x = hud_width / 2  # Desired center x-coordinate (middle of HUD)
+            arrow_y = 30  # Desired center y-coordinate
+            arrow_pixmap = self.get_hud_arrow_pixmap(self.rotation)
+            if not arrow_pixmap.isNull():
+                arrow_item = self.get_hud_item("arrow", QGraphicsPixmapItem)
+                arrow_item.setPixmap(arrow_pixmap)
+                # Adjust position so the center of the pixmap is at (arrow_x, arrow_y)
+                arrow_item.setPos(arrow_x - arrow_pixmap.width() / 2, arrow_y - arrow_pixmap.height() / 2)
+            else:
+                print("Warning: Arrow sprite not found")
+        # primary and secondary hand items 
         if self.player: 
-            primary = self.player.primary_hand
-            secondary = self.player.secondary_hand
             wp_img_scale = int(math.floor( TILE_SIZE/1.5 ))
-            if primary:
-                pr_graphics_pixmap = QGraphicsPixmapItem(primary.get_sprite().scaled(wp_img_scale, wp_img_scale, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                pr_graphics_pixmap.setPos( (self.view_width-1)*TILE_SIZE, (self.view_height-1)*TILE_SIZE )
-                self.scene.addItem(pr_graphics_pixmap)
-            if secondary:
-                sc_graphics_pixmap = QGraphicsPixmapItem( secondary.get_sprite().scaled(wp_img_scale, wp_img_scale, Qt.KeepAspectRatio, Qt.SmoothTransformation) )
-                sc_graphics_pixmap.setPos( TILE_SIZE-wp_img_scale, (self.view_height-1)*TILE_SIZE )
-                self.scene.addItem(sc_graphics_pixmap)
+            hands = (
+                ("primary", self.player.primary_hand, ((self.view_width-1)*TILE_SIZE, (self.view_height-1)*TILE_SIZE)),
+                ("secondary", self.player.secondary_hand, (TILE_SIZE-wp_img_scale, (self.view_height-1)*TILE_SIZE))
+            )
+            for name, hand_item, pos in hands:
+                if not self.hud_changed(name, hand_item.sprite if hand_item else None): continue
+                graphics_pixmap = self.get_hud_item(name, QGraphicsPixmapItem)
+                if hand_item: 
+                    graphics_pixmap.setPixmap(self.get_hud_icon_pixmap(hand_item))
+                    graphics_pixmap.setPos(*pos)
+                graphics_pixmap.setVisible(bool(hand_item))
     def rotate_vector_for_camera(self, dx, dy):
         """ Rotation for drawing (camera)"""
         if self.rotation == 0:
@@ -513,18 +663,31 @@ class Game_PLAYERS:
         if self.player.days_survived == 30:
             self.journal_window.append_text("(Skill - 30 days) Now I'm proficient with many weapons, I can use special moves using F key ...") 
 class Game_MAPTRANSITION:
+    horizontal_map_types = ["procedural_lake", "procedural_field", "procedural_road", "procedural_forest"]
     def __init__(self):
         self.current_map = (0,0,0) # Current map coordinates
+        self.world_seed = random.getrandbits(32) # the maps are generated with Map_Seed(world_seed, coords) 
         self.map = Map()
-        self.maps = {(0,0,0):self.map}  # Store Map objects with coordinate keys
+        self.maps = MapCache(on_evict = self.on_map_evicted, pinned = lambda: (self.current_map, (0,0,0))) # Store Map objects with coordinate keys
+        self.maps[(0,0,0)] = self.map 
+        self.map_prefetcher = MapPrefetcher()
         self.flag_event_prevent_map_transition = False 
+    def get_map_seed(self, coords):
+        return Map_Seed(self.world_seed, coords)
+    def on_map_evicted(self, coords, map_obj):
+        """ a map dropped by the cache is saved, it is loaded again on the next visit """
+        print(f"Map {coords} Evicted from Cache")
+        self.save_map(map_obj, coords=coords, slot=self.current_slot)
     def load_map_from_coords_to_cache_if_visited(self, coords = (0,0,0)):
         if coords in self.maps: 
             if not self.maps[coords] is None:
                 print(f"Map {coords} Already on Cache")
                 return True 
+        if not self.has_map(coords=coords, slot=self.current_slot):
+            print(f"Map {coords} Not Visited Yet") 
+            return False 
         M = Map(coords=coords)
-        if M.Load_JSON( self.get_map_file(coords=coords, slot=self.current_slot) ):
+        if self.load_map(M, coords=coords, slot=self.current_slot):
             print(f"Map {coords} Sucessfully Loaded")
             self.maps.update( { coords: M } )
             return True 
@@ -541,7 +704,8 @@ class Game_MAPTRANSITION:
         self.load_random_music()
         def teleport_subroutine():
             self.map.remove_character(char=self.player)
-            self.map.Save_JSON( self.get_map_file(coords=self.current_map) )
+            self.save_map(self.map, coords=self.current_map, slot=self.current_slot)
+            self.map.grid.compact() # the map left keeps only its special tiles materialized 
             self.player.current_map = map_coords
             self.current_map = map_coords 
             self.player.x = x 
@@ -551,7 +715,7 @@ class Game_MAPTRANSITION:
             # placing character to the new map 
             self.safely_place_character_to_new_map() 
             self.place_players() 
-            self.scene.clear() 
+            self.clear_scene() 
             self.dirty_tiles.clear() 
             self.draw_grid() 
             self.draw_hud() 
@@ -580,45 +744,100 @@ class Game_MAPTRANSITION:
             new_map_coord = (self.current_map[0], self.current_map[1] + 1, self.current_map[2])
             new_y = 0
         return new_x, new_y, new_map_coord
-    def fill(self):
-        if len(self.map.enemies) < 15: self.map.fill_enemies(num_enemies=FILL_ENEMIES_QT)
-        if len(self.map.spawners) < 5: self.map.fill_spawners(num_spawners=FILL_SPAWNERS_QT)
-        print("Enemies :", len(self.map.enemies), "Spawners :", len(self.map.spawners))
+    def fill(self, map_obj = None):
+        if map_obj is None: map_obj = self.map 
+        if len(map_obj.enemies) < 15: map_obj.fill_enemies(num_enemies=FILL_ENEMIES_QT)
+        if map_obj.get_spawner_count() < 5: map_obj.fill_spawners(num_spawners=FILL_SPAWNERS_QT)
+        print("Enemies :", len(map_obj.enemies), "Spawners :", map_obj.get_spawner_count())
+    def get_maps_near_player(self):
+        """ (coords, map type, previous coords, going up) of the maps the player may enter soon : 
+        the adjacent maps of the borders closer than MAP_PREFETCH_DISTANCE and the target of the stair under the player. 
+        The map type of the adjacent maps is None, prefetch_maps_near_player picks it when it queues the map. """
+        x, y, z = self.current_map 
+        px, py = self.player.x, self.player.y 
+        near = []
+        if px < MAP_PREFETCH_DISTANCE: near.append((x-1, y, z))
+        if px >= self.grid_width - MAP_PREFETCH_DISTANCE: near.append((x+1, y, z))
+        if py < MAP_PREFETCH_DISTANCE: near.append((x, y-1, z))
+        if py >= self.grid_height - MAP_PREFETCH_DISTANCE: near.append((x, y+1, z))
+        near = [ (coords, None, None, False) for coords in near ]
+        tile = self.map.get_tile(px, py)
+        if tile and tile.stair: 
+            near.append( (tuple(tile.stair), "procedural_dungeon", self.current_map, tile.default_sprite_key == "stair_up") )
+        return near 
+    def prefetch_maps_near_player(self):
+        """ start loading or generating the maps near the player which aren't cached nor staged """
+        slot = self.current_slot 
+        self.get_world_index(slot) # created here, not on the worker 
+        for coords, map_type, prev_coords, up in self.get_maps_near_player():
+            if coords in self.maps.keys() or self.map_prefetcher.is_staged(coords): continue 
+            if map_type is None: map_type = random.choice(self.horizontal_map_types)
+            seed = self.get_map_seed(coords)
+            self.map_prefetcher.request(coords, lambda c=coords, t=map_type, p=prev_coords, u=up, s=slot, r=seed: self.prefetch_map(c, t, p, u, slot=s, seed=r))
+    def prefetch_map(self, coords, map_type, prev_coords = None, up = False, slot = 1, seed = None):
+        """ runs on the prefetch worker, returns (map, b_generated) : the saved map, or a new one generated from the seed. 
+        The slot and the seed are taken when the job is queued, the worker reads the saves (has_map, load_map) and builds a map nobody else sees. 
+        The generation draws from the random.Random(seed) of the map. The fill isn't done here : the constructors of the enemies 
+        draw from the random module, it runs on the game thread in use_prefetched_map. """
+        map_obj = Map(coords=coords)
+        if self.has_map(coords=coords, slot=slot) and self.load_map(map_obj, coords=coords, slot=slot): return map_obj, False 
+        width, height = Get_Map_Size(map_type)
+        map_obj = Map(map_type, coords=coords, width=width, height=height, previous_coords=prev_coords, going_up=up, b_generate=True, seed=seed)
+        return map_obj, True 
+    def use_prefetched_map(self, map_obj, b_generated):
+        """ map_transition with a map of the prefetcher, returns the same values as loading or generating it. 
+        The maps are filled here, on the game thread, like in map_transition. """
+        print(f"Using Prefetched Map {self.current_map}")
+        self.map = map_obj 
+        self.maps[self.current_map] = map_obj 
+        if b_generated:
+            self.clear_scene()
+            self.events = []
+        self.fill()
+        if b_generated: return self.map.starting_x, self.map.starting_y 
+        return None, None
     def new_map_from_current_coords(
             self, 
             filename = "default", 
             prev_coords = None, 
             up = False
         ):
-        self.scene.clear()
-        self.tile_items.clear()
+        self.clear_scene()
         self.events = []
+        width, height = Get_Map_Size(filename)
         self.map = Map(
             filename, 
             coords=self.current_map, 
+            width=width, 
+            height=height, 
             previous_coords = prev_coords, 
             going_up = up,
-            b_generate = True
+            b_generate = True, 
+            seed = self.get_map_seed(self.current_map)
         )
         self.maps[self.current_map] = self.map # update the cached maps 
         self.fill()
         return self.map.starting_x, self.map.starting_y 
     def map_transition(
             self, 
-            new_map_file, 
             new_map_coord, 
             map_type, 
             prv_coords = None, 
             going_up = False
         ):
         self.load_random_music()
+        self.map.grid.compact() # the map left keeps only its special tiles materialized 
         self.player.current_map = new_map_coord
         self.current_map = new_map_coord
         self.move_party()
+        staged = self.map_prefetcher.take(new_map_coord)
+        self.map_prefetcher.discard() # the other staged maps are neighbours of the previous map 
+        if new_map_coord not in self.maps and staged: 
+            return self.use_prefetched_map(*staged)
         if new_map_coord not in self.maps: 
             self.maps[self.current_map] = Map(coords=self.current_map)
             self.map = self.maps[self.current_map]
-            if not self.map.Load_JSON(new_map_file):
+            if not self.load_map(self.map, coords=new_map_coord, slot=self.current_slot):
                 if new_map_coord:
                     print(f"Creating new map at ({new_map_coord[0]}, {-new_map_coord[1]}, {new_map_coord[2]})")
                 return self.new_map_from_current_coords(map_type, prev_coords = prv_coords, up = going_up)
@@ -664,26 +883,26 @@ class Game_MAPTRANSITION:
         # print(">>> ", self.map, self.current_map)
         new_x, new_y, new_map_coord = self.player_new_x_y_horizontal(x,y)
         if not new_map_coord: return 
-        # saves_dir = "./saves"
-        # previous_map_file = os.path.join(saves_dir, f"map_{'_'.join(map(str, self.current_map))}_1.json")
-        # new_map_file = os.path.join(saves_dir, f"map_{'_'.join(map(str, new_map_coord))}_1.json")
-        previous_map_file = self.get_map_file(coords=self.current_map)
-        new_map_file = self.get_map_file(coords=new_map_coord)
         # removes the character from previous map
         self.map.remove_character(self.player)
-        # save the previous map 
-        self.map.Save_JSON(previous_map_file)
+        # save the previous map (replaces the snapshot queued by save_current_game)
+        self.save_map(self.map, coords=self.current_map, slot=self.current_slot)
         # update player
         self.player.x = new_x
         self.player.y = new_y
         # check if the map already in self.maps
-        map_type = random.choice(["procedural_lake", "procedural_field", "procedural_road", "procedural_forest"])
+        map_type = random.choice(self.horizontal_map_types)
         #map_type = "procedural_lake" # debug 
-        self.map_transition(new_map_file, new_map_coord, map_type)
+        self.map_transition(new_map_coord, map_type)
+        # the new map may have another size ( MAP_SIZES ) 
+        if x < 0: self.player.x = self.map.width - 1
+        if y < 0: self.player.y = self.map.height - 1
+        self.player.x = max(0, min(self.player.x, self.map.width - 1))
+        self.player.y = max(0, min(self.player.y, self.map.height - 1))
         # placing character to the new map 
         self.safely_place_character_to_new_map()
         self.place_players() # testing
-        self.scene.clear()
+        self.clear_scene()
         self.dirty_tiles.clear()
         self.draw_grid()
         self.draw_hud()
@@ -705,19 +924,19 @@ class Game_MAPTRANSITION:
         # Variables
         # saves_dir = "./saves"
         new_map_coord = target_map_coords
-        # previous_map_file = os.path.join(saves_dir, f"map_{'_'.join(map(str, self.current_map))}_1.json")
-        # new_map_file = os.path.join(saves_dir, f"map_{'_'.join(map(str, new_map_coord))}_1.json")
-        previous_map_file = self.get_map_file(coords=self.current_map)
-        new_map_file = self.get_map_file(coords=new_map_coord)
         prev_x = self.player.x 
         prev_y = self.player.y 
         new_x = self.player.current_tile.stair_x
         new_y = self.player.current_tile.stair_y 
         prev_map_coord = self.map.coords
+        if new_x is None or new_y is None: # stair without target position, the saved target map knows its stair back 
+            back = next(( s for s in self.get_map_stairs(new_map_coord, slot=self.current_slot) if tuple(s[2]) == tuple(prev_map_coord) ), None)
+            if back: new_x, new_y = back[0], back[1]
+        prev_map = self.map # the cache may evict it during the transition 
         prev_tile = self.player.current_tile 
         # Remove the Player and Save the Current Map 
         self.map.remove_character(self.player)
-        self.map.Save_JSON(previous_map_file)
+        self.save_map(self.map, coords=prev_map_coord, slot=self.current_slot)
         # update player position from the stair 
         self.player.x = new_x
         self.player.y = new_y
@@ -728,18 +947,22 @@ class Game_MAPTRANSITION:
         # do map transition || % old map || % cached || use the info on the stair to do the transition 
         
         # if a new map was created the test_x and test_y must be used to update the player position and the previous tile must be updated and the map saved again
-        test_x, test_y = self.map_transition(new_map_file, new_map_coord, "procedural_dungeon", prev_map_coord, up) 
+        test_x, test_y = self.map_transition(new_map_coord, "procedural_dungeon", prev_map_coord, up) 
         if test_x:
             self.player.x = test_x
             self.player.y = test_y
             prev_tile.stair_x = test_x 
             prev_tile.stair_y = test_y 
+            prev_tile.mark_changed()
             if self.map.place_character(self.player):
                 new_tile = self.player.current_tile
                 new_tile.stair_x = prev_x
                 new_tile.stair_y = prev_y
-            self.maps[prev_map_coord].Save_JSON(previous_map_file) # save with the updated tile 
-            self.maps[new_map_coord].Save_JSON(new_map_file) 
+                new_tile.mark_changed()
+            # save both maps with the updated stair tiles, in the same transaction with the sqlite backend 
+            self.save_map(prev_map, coords=prev_map_coord, slot=self.current_slot, b_commit=False) 
+            self.save_map(self.map, coords=new_map_coord, slot=self.current_slot, b_commit=False) 
+            self.commit_saves(self.current_slot)
         else: # old map
             if not self.map.place_character(self.player):
                 print(">>> Failed to Place Character")
@@ -747,7 +970,7 @@ class Game_MAPTRANSITION:
         self.safely_place_character_to_new_map()
         self.place_players() # testing
         # Update of Game Scene 
-        self.scene.clear()
+        self.clear_scene()
         self.dirty_tiles.clear()
         self.draw_grid()
         self.draw_hud()
@@ -755,6 +978,7 @@ class Game_MAPTRANSITION:
 class Game_DATA:
     def __init__(self):
         self.current_slot = 1  # Track current save slot
+        self.world_indexes = {} # slot -> WorldIndex 
     def from_dict(self, dictionary):
         if not super().from_dict(dictionary):
             return False
@@ -763,8 +987,7 @@ class Game_DATA:
         return True
     def start_new_game(self, new_character_name = "Main Character", b_clear_players = True):
         """Reset the game to a new state."""
-        self.scene.clear()
-        self.tile_items.clear()
+        self.clear_scene()
         self.current_map = (0, 0, 0)
         if b_clear_players: self.players.clear()
         b_is_new = False
@@ -822,13 +1045,86 @@ class Game_DATA:
         return True 
     def get_map_file(self, coords = (0,0,0), slot=1):
         return Get_Map_File_From_Coords(coords=coords, save_slot=slot)
+    def get_map_binary_file(self, coords = (0,0,0), slot=1):
+        return os.path.splitext(self.get_map_file(coords=coords, slot=slot))[0] + ".sav"
     def get_player_file(self, slot=1):
         saves_dir = "./saves"
         return os.path.join(saves_dir, f"player_state_{slot}.json")
-    def save_current_game(self, slot=1):
-        """Save the current map to its JSON file and player state to a central file."""
+    def get_slot_store(self, slot=1):
+        return SlotStore.Open(os.path.join("./saves", f"slot_{slot}.db"))
+    def get_world_index_file(self, slot=1):
+        return os.path.join("./saves", f"world_{slot}.json")
+    def get_world_index(self, slot=1):
+        """ the WorldIndex of the slot, loaded on first use """
+        index = self.world_indexes.get(slot, None)
+        if index is None:
+            index = WorldIndex()
+            if SAVE_BACKEND == "sqlite":
+                data = self.get_slot_store(slot).get_state("world_index")
+                if data: index.from_dict(data)
+            else:
+                index.Load_JSON(self.get_world_index_file(slot))
+            self.world_indexes[slot] = index 
+        return index 
+    def save_map(self, map_obj, coords=(0,0,0), slot=1, b_commit=True):
+        """ save map_obj in the slot with SAVE_BACKEND and update the world index, the sqlite rows are written on commit """
+        index = self.get_world_index(slot)
+        index.update(coords, map_obj.get_summary())
+        if SAVE_BACKEND == "sqlite":
+            store = self.get_slot_store(slot)
+            store.put_map(coords, map_obj.to_dict())
+            map_obj.clear_changes() # the rows are whole maps, the changes are only tracked for the journal 
+            store.put_state("world_index", index.to_dict())
+            if b_commit: self.commit_saves(slot)
+            return True 
+        index.Save_JSON_Async(self.get_world_index_file(slot))
+        if SAVE_BACKEND == "binary":
+            return map_obj.Save_Binary( self.get_map_binary_file(coords=coords, slot=slot) )
+        return map_obj.Save_JSON_Incremental( self.get_map_file(coords=coords, slot=slot) )
+    def load_map(self, map_obj, coords=(0,0,0), slot=1):
+        if SAVE_BACKEND == "sqlite":
+            data = self.get_slot_store(slot).get_map(coords)
+            if data is None:
+                print(f"Map {coords} not found in slot {slot}")
+                return False 
+            return map_obj.from_dict(data)
+        if SAVE_BACKEND == "binary":
+            return map_obj.Load_Binary( self.get_map_binary_file(coords=coords, slot=slot) )
+        return map_obj.Load_JSON( self.get_map_file(coords=coords, slot=slot) )
+    def has_map(self, coords=(0,0,0), slot=1):
+        """ True if the map was saved in the slot, without loading it (the files are checked for the maps saved before the world index) """
+        if self.get_world_index(slot).is_visited(coords): return True 
+        if SAVE_BACKEND == "sqlite": return self.get_slot_store(slot).has_map(coords)
+        if SAVE_BACKEND == "binary":
+            filename = self.get_map_binary_file(coords=coords, slot=slot)
+            return SAVE_WRITER.is_pending(filename) or SaveContainer.Is_Valid(filename)
+        filename = self.get_map_file(coords=coords, slot=slot)
+        return SAVE_WRITER.is_pending(filename) or os.path.exists(filename)
+    def get_map_stairs(self, coords=(0,0,0), slot=1):
+        """ [x, y, target coords, target x, target y] of the stairs of a saved map, without loading it : 
+        from the world index, or from the "summary" section alone with the binary backend """
+        record = self.get_world_index(slot).get(coords)
+        if record: return record["stairs"]
+        if SAVE_BACKEND == "binary":
+            filename = self.get_map_binary_file(coords=coords, slot=slot)
+            if SAVE_WRITER.is_pending(filename) or SaveContainer.Is_Valid(filename):
+                summary = Map.Read_Sections(filename, "summary")["summary"]
+                if summary: return summary["stairs"]
+        return []
+    def load_player_state(self, slot=1):
+        if SAVE_BACKEND == "sqlite":
+            data = self.get_slot_store(slot).get_player()
+            return data is not None and self.from_dict(data)
+        return self.Load_JSON( self.get_player_file(slot=slot) )
+    def commit_saves(self, slot=1):
+        """ with the sqlite backend, write the staged rows of the slot in one transaction (in background) """
+        if SAVE_BACKEND == "sqlite": self.get_slot_store(slot).commit()
+    def save_current_game(self, slot=1, b_flush=False):
+        """Save the current map to its JSON file and player state to a central file (or to the slot database, SAVE_BACKEND). 
+        The files are written in background by SAVE_WRITER, b_flush waits until they are on disk. """
         self.check_player_dict()
         saves_dir = "./saves"
+        player_file = self.get_player_file(slot=slot)
         T1 = tic()
         # Delay the save operation slightly to allow fade-in
         try:
@@ -839,28 +1135,29 @@ class Game_DATA:
             # if not os.path.exists(saves_dir): os.makedirs(saves_dir)
             # Save current map state
             # os.path.join(saves_dir, f"map_{'_'.join(map(str, self.current_map))}_{slot}.json")
-            map_file = self.get_map_file(coords=self.current_map, slot=slot) 
             #T2 = tic()
-            self.map.Save_JSON(map_file)
+            self.save_map(self.map, coords=self.current_map, slot=slot, b_commit=False)
             #toc(T2,"Game.save_current_game() || map.Save_JSON() ||")
             # save the player_file 
-            player_file = self.get_player_file(slot=self.current_slot) # os.path.join(saves_dir, f"player_state_{slot}.json")
             #T3 = tic()
-            self.Save_JSON( player_file )
+            if SAVE_BACKEND == "sqlite":
+                self.get_slot_store(slot).put_player(self.to_dict())
+            else:
+                # Backup player state, copied by the writer after the player file is written 
+                self.Save_JSON_Async( player_file, backup = os.path.join(saves_dir, f"player_state_{slot}.json.bak") )
             #toc(T3,"Game.save_current_game() || Game.Save_JSON() ||")
-            # Backup player state
-            #T4 = tic()
-            if os.path.exists(player_file): shutil.copy(player_file, os.path.join(saves_dir, f"player_state_{slot}.json.bak"))
-            #toc(T4,"Game.save_current_game() || Backup Save ||")
             # Save journal
             #T5 = tic()
             if self.journal_window: self.journal_window.save_journal()
             #toc(T5,"Game.save_current_game() || Journal Save ||")
+            self.commit_saves(slot) # map, player and journal in one transaction 
+            if b_flush and not SAVE_WRITER.flush():
+                raise IOError("the background writer did not finish")
             self.add_message(f"Game saved to slot {slot}!")
         except Exception as e:
             self.add_message(f"Failed to save game: {e}")
             print(f"Error saving game: {e}")
-            if os.path.exists(os.path.join(saves_dir, f"player_state_{slot}.json.bak")):
+            if SAVE_BACKEND == "json" and os.path.exists(os.path.join(saves_dir, f"player_state_{slot}.json.bak")):
                 shutil.copy(os.path.join(saves_dir, f"player_state_{slot}.json.bak"), player_file)  # Restore backup
         toc(T1, "Game.save_current_game() ||")
     def try_load_map_or_create_new(self):
@@ -868,11 +1165,10 @@ class Game_DATA:
         b_result = False
         # saves_dir = "./saves"
         # os.path.join(saves_dir, f"map_{'_'.join(map(str, self.current_map))}_{self.current_slot}.json")
-        map_file = self.get_map_file(coords=self.current_map, slot=self.current_slot) 
         self.map = Map("default", coords=self.current_map)
-        if not self.map.Load_JSON(map_file):
+        if not self.load_map(self.map, coords=self.current_map, slot=self.current_slot):
             self.add_message(f"No map save file found for slot {self.current_slot}")
-            print(f"No map save file found: {map_file}")
+            print(f"No map save file found: {self.current_map}")
             self.new_map_from_current_coords()
             b_result = True
         self.maps[self.current_map] = self.map
@@ -880,9 +1176,8 @@ class Game_DATA:
     def load_current_game(self, slot=1):
         """Load player state and current map from their respective JSON files."""
         #T1 = tic()
-        player_file = self.get_player_file(slot=slot) # os.path.join(saves_dir, f"player_state_{slot}.json")
-        if not self.Load_JSON(player_file):
-            print(f"Failed to Load or no File Found: {player_file}")
+        if not self.load_player_state(slot):
+            print(f"Failed to Load or no File Found: player state of slot {slot}")
             self.start_new_game()
             return         
         print("Current Player :", self.current_player)
@@ -896,10 +1191,10 @@ class Game_DATA:
                     break 
         self.set_player(self.current_player)
         # Clear current state
-        self.scene.clear()
-        self.tile_items.clear()
+        self.clear_scene()
         self.events.clear()
         self.maps.clear()
+        self.map_prefetcher.discard()
         # Load current map
         self.try_load_map_or_create_new()
         # place current character
@@ -1010,6 +1305,7 @@ class Game_ITERATION:
         self.Event_NewTurn()
         self.process_events() 
         self.update_players() 
+        self.update_chunks()
         self.update_enemies()
         self.update_buildings()
         self.update_spawners()
@@ -1097,6 +1393,11 @@ class Game_ITERATION:
             T += dt 
         # if self.flag_performance_players: print("performance mode: update_players()")     
         toc(t_1, "game.update_players() ||")
+    def update_chunks(self):
+        """ load the chunks of the current map near the players, unload the far ones """
+        positions = [ (v.x, v.y) for v in self.players.values() if v.current_map == self.current_map and not v.party ]
+        positions.append((self.player.x, self.player.y))
+        self.map.update_chunks(positions)
     def update_enemies(self): # maybe more maps could be updated, like maps with alive players 
         self.map.update_enemies(self)
     def update_buildings(self):
@@ -1114,6 +1415,7 @@ class Game_ITERATION:
                     map.update_buildings_sets_iteration(b)
                     continue     
             b.update(self)
+            b.mark_changed()
             map.update_buildings_sets_iteration(b)
             dt = toc(t)[0] 
             t += dt 
@@ -1123,7 +1425,9 @@ class Game_ITERATION:
     def update_spawners(self):
         map = self.map
         for sp in map.spawners:
-            sp.update(self) 
+            if not map.is_active_xy(sp.x, sp.y): continue 
+            cooldown = sp.spawn_cooldown
+            if sp.update(self) or cooldown: sp.mark_changed()
     def Event_NewTurn(self):
         if self.turn // self.turns_per_day + 1 > self.current_day:
             self.current_day += 1
@@ -1144,7 +1448,9 @@ class Game_ITERATION:
         if len(self.players)<8: return False 
         if d() >= probability: return False 
         xy = self.home_castle_location 
-        if xy is None: xy = (50,50) 
+        if xy is None: # a castle of the home map known by the world index 
+            castle = next(self.get_world_index(self.current_slot).find_buildings("Castle", b_enemy=False, coords=(0,0,0)), None)
+            xy = (castle[1][1], castle[1][2]) if castle else (50,50) 
         self.teleport_to_map(x=xy[0], y=xy[1], map_coords=(0, 0, 0)) 
         def siege_event_iteration(count, game = None, instance=None): 
             map = game.map 
@@ -1307,7 +1613,8 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
         "window_x",
         "window_y",
         "home_castle_location",
-        "flag_event_prevent_map_transition"
+        "flag_event_prevent_map_transition",
+        "world_seed"
     ]
     def __init__(self):
         DraggableView.__init__(self)
@@ -1351,7 +1658,7 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
         """Save the game state when the window is closed."""
         try:
             self.add_message("Saving game before exit...")
-            self.save_current_game(slot=1)
+            self.save_current_game(slot=1, b_flush=True)
         except Exception as e:
             self.add_message(f"Error saving game on exit: {e}")
             print(f"Error saving game on exit: {e}")
@@ -1502,6 +1809,9 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
                 else:
                     self.behaviour_controller_window.update()
                     self.behaviour_controller_window.show()
+            case Qt.Key_O: # cycle zoom levels 
+                self.cycle_zoom()
+                return True 
             case Qt.Key_P: # party window
                 if not self.party_window:
                     self.party_window = PartyWindow(self)
@@ -1526,7 +1836,7 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
                 return True
         match key: # main menu options 
             case Qt.Key_F5:
-                self.save_current_game(slot=1)
+                self.save_current_game(slot=1, b_flush=True)
                 return
             case Qt.Key_F7:
                 self.load_current_game(slot=1)
@@ -1555,6 +1865,7 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
                     self.events.append(MoveEvent(self.player, old_x, old_y))
                     self.dirty_tiles.add((old_x, old_y))
                     self.dirty_tiles.add((self.player.x, self.player.y))
+                    self.prefetch_maps_near_player()
             return True
         return False 
     def get_facing_player(self):
@@ -1598,6 +1909,7 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
                     elif isinstance(tile, TileBuilding):
                         if tile.b_enemy: return False 
                         if isinstance(tile, Castle): self.home_castle_location = (tile.x, tile.y)
+                        tile.mark_changed() # the menu changes the building ( journal of the map save ) 
                         SB = SelectionBox( tile.menu_list, action = tile.action(), parent = self, game_instance = self )
                         tile.update_menu_list(SB)
                         SB.show()
@@ -1706,6 +2018,7 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
         # -- tile building 
         if isinstance(_tile, TileBuilding) and _mag == 0:
             if _tile.b_enemy: return False 
+            _tile.mark_changed() # the menu changes the building ( journal of the map save ) 
             SB = SelectionBox( _tile.menu_list, action = _tile.action(), parent = self, game_instance = self )
             _tile.update_menu_list(SB)
             SB.show()
@@ -1801,8 +2114,13 @@ class Game(DraggableView, Serializable, Game_VIEWPORT, Game_SOUNDMANAGER, Game_P
             self.game_iteration()
             return 
     def get_mouse_move_diff(self):
-        _diff = vec.subtract( (self.mouse_x, self.mouse_y) , self.get_anchor() )
-        _diff = vec.scalar_multiply(1/TILE_SIZE, _diff)
+        anchor = self.get_anchor()
+        if self.is_zoomed_out(): # player slot in the zoomed out view 
+            cx, cy = self.get_lod_center()
+            rx, ry = self.rotate_vector_for_camera(self.player.x - cx, self.player.y - cy)
+            anchor = vec.add( self.get_lod_anchor(), (rx*self.get_view_tile_size(), ry*self.get_view_tile_size()) )
+        _diff = vec.subtract( (self.mouse_x, self.mouse_y) , anchor )
+        _diff = vec.scalar_multiply(1/self.get_view_tile_size(), _diff)
         _diff = vec.to_integer_vector(_diff)
         return _diff 
     def mouseReleaseEvent(self, event):
@@ -74,12 +74,42 @@ STAMINA_CONS_MAP_TRANS = 50
 # map configuration 
 MAP_WIDTH = 70
 MAP_HEIGHT = 70 
+MAP_SIZES = {} # map type -> (width, height) of the maps bigger or smaller than MAP_WIDTH x MAP_HEIGHT, ex. {"procedural_forest": (512, 512)} 
+MAP_CHUNK_SIZE = 32 # maps are split in chunks of MAP_CHUNK_SIZE x MAP_CHUNK_SIZE cells, loaded and simulated near the players 
+MAP_CHUNK_ACTIVE_DISTANCE = 2 # chunks at most this many chunks away from a player are loaded and simulated 
+MAP_CACHE_MAX_ENTRIES = 16 # maps kept in memory, the least recently visited are saved and dropped 
+MAP_CACHE_MAX_BYTES = 64*1024*1024 # approximate memory budget of the cached maps 
+MAP_CACHE_TILE_BYTES = 290 # measured memory of a materialized tile, used for the estimate 
+MAP_CACHE_TERRAIN_CELL_BYTES = 10 # memory of a cell of the terrain layer ( palette index and empty tile slot )
+MAP_CACHE_CHARACTER_BYTES = 3000 # measured memory of an enemy 
+MAP_PREFETCH_DISTANCE = 5 # the adjacent map is loaded or generated in background when the player is this close to a border 
+MAP_PREFETCH_WORKERS = 1 # threads of the map prefetcher 
+
+# saves 
+MAP_JOURNAL_SUFFIX = ".journal" # map saves append the changed tiles to map file + suffix 
+MAP_JOURNAL_MAX_BYTES = 256*1024 # above this journal size the next map save writes a full snapshot 
+SAVE_BACKEND = "json" # "json" : a file per map, player state and journal ; "sqlite" : one database per slot ( saves/slot_<n>.db ) ; "binary" : maps in compressed containers ( .sav ) 
 
 # View Port
 TILE_SIZE = 65
 VIEW_WIDTH_IN_TILES = 7
 VIEW_HEIGHT_IN_TILES = 9
 
+# render caches 
+TILE_RENDER_CACHE_MAX_BYTES = 32*1024*1024 # memory cap of composed tile pixmaps (~1900 tiles of 65x65)
+ROTATED_SPRITE_CACHE_MAX_BYTES = 4*1024*1024 # memory cap of sprites rotated by non-cardinal angles 
+LOD_ROW_CACHE_MAX_BYTES = 8*1024*1024 # memory cap of the row pixmaps of the zoomed out view 
+LOD_TILE_SIZES = (32, 16, 8, 6) # pixel size of a tile on each zoomed out level, 6 shows a whole 70x70 map 
+LOD_COLOR_MAX_TILE_SIZE = 8 # at this tile size and below the zoomed out view draws one color per tile instead of thumbnails 
+
+# sprite loading 
+ASSETS_FOLDER = "./assets"
+SPRITE_CACHE_FOLDER = "./cache/sprites" # pre-scaled sprites, one subfolder per tile size 
+SPRITE_DECODE_WORKERS = 4 # threads decoding sprites 
+SPRITE_LAZY_LOADING = True # sprites are loaded in background on first access, a placeholder is drawn meanwhile 
+SPRITE_REGISTRY_MAX_BYTES = 16*1024*1024 # memory cap of the loaded sprites, least recently used are evicted 
+SPRITE_POLL_INTERVAL = 50 # ms between checks for finished background sprite loads 
+
 # player
 PLAYER_MAX_HP = 100
 PLAYER_MAX_STAMINA = 200
@@ -164,7 +194,7 @@ SPRITE_NAMES_TILES = [
     "shallow_water",
     "rock"
 ]
-SPRITE_NAMES = Get_Sprite_Names_From("./assets")
+SPRITE_NAMES = Get_Sprite_Names_From(ASSETS_FOLDER)
 
 # loot
 HAND_SLOTS = ['primary_hand', 'secondary_hand' ]
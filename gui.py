@@ -443,10 +443,16 @@ class JournalWindow(Dialog):
         saves_dir = "./saves"
         journal_file = os.path.join(saves_dir, f"journal_{slot}_{current_char_name}.txt")
         try:
-            with open(journal_file, "r", encoding="utf-8") as f:
-                self.text_to_pages(f.read())
+            if SAVE_BACKEND == "sqlite":
+                text = self.parent().get_slot_store(slot).get_journal(current_char_name)
+                if text is None: raise FileNotFoundError(journal_file)
+                self.text_to_pages(text)
                 self.text_edit.setPlainText( self.get_current_page_text() )
-                # self.text_edit.setPlainText(f.read())
+            else:
+                with open(journal_file, "r", encoding="utf-8") as f:
+                    self.text_to_pages(f.read())
+                    self.text_edit.setPlainText( self.get_current_page_text() )
+                    # self.text_edit.setPlainText(f.read())
         except FileNotFoundError:
             self.text_to_pages("")
             self.text_edit.setPlainText("")  # Empty journal if file doesn't exist
@@ -470,10 +476,14 @@ class JournalWindow(Dialog):
         journal_file = os.path.join(saves_dir, f"journal_{slot}_{current_char_name}.txt")
         try:
             os.makedirs(saves_dir, exist_ok=True)
-            with open(journal_file, "w", encoding="utf-8") as f:
-                self.current_content[self.current_page] = self.text_edit.toPlainText()
-                f.write(self.pages_to_text())
-                # f.write(self.text_edit.toPlainText())
+            self.current_content[self.current_page] = self.text_edit.toPlainText()
+            if SAVE_BACKEND == "sqlite":
+                self.parent().get_slot_store(slot).put_journal(current_char_name, self.pages_to_text())
+                self.parent().commit_saves(slot)
+            else:
+                with open(journal_file, "w", encoding="utf-8") as f:
+                    f.write(self.pages_to_text())
+                    # f.write(self.text_edit.toPlainText())
             self.parent().add_message("Journal saved")
         except Exception as e:
             self.parent().add_message(f"Failed to save journal: {e}")
@@ -1087,10 +1097,10 @@ def main_menu(menu, item, instance, game_instance):
     elif menu == "Save Game >":
         match item:
             case "Slot 1":
-                game_instance.save_current_game(slot = 1)
+                game_instance.save_current_game(slot = 1, b_flush = True)
                 instance.close()
             case "Slot 2":
-                game_instance.save_current_game(slot = 2)
+                game_instance.save_current_game(slot = 2, b_flush = True)
                 instance.close()
     elif menu == "Select Player Sprite >":
         if item != "[ Character Settings > Select Sprite ]":
@@ -1312,6 +1322,7 @@ def debugging_menu(menu, item, instance, game_instance):
                 return 
             case "Generate Dungeon Entrance":
                 if game_instance.map.add_dungeon_entrance_at(player.x, player.y):
+                    game_instance.save_map(game_instance.map, coords=game_instance.map.coords) # persist the stair 
                     game_instance.dirty_tiles.add((player.x, player.y)) 
                     game_instance.draw()
                 instance.close()
@@ -1383,6 +1394,7 @@ def debugging_menu(menu, item, instance, game_instance):
             case "clear":
                 for char in game_instance.map.enemies: game_instance.map.remove_character(char)
                 game_instance.map.enemies.clear()
+                game_instance.map.dirty_fields = True 
                 game_instance.draw()
                 instance.close()
                 return 
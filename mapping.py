@@ -4,9 +4,13 @@
 import random
 import math
 import os 
+import json
+import hashlib
 from heapq import heappush, heappop
-from itertools import product, count
-from collections import deque
+from itertools import product, count, compress
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from array import array
 
 # third-party 
 from PyQt5.QtCore import Qt
@@ -72,12 +76,270 @@ def GetRandomTiles_Reservoir_Sampling(tile_container=None, foreach_tiles=None, k
     foreach_tiles(tile_container, sampler, state)
     return state['reservoir']
 
+def Noise_Field(function, width, height, scale, **kwargs):
+    """ values of the noise function ( noise.snoise2, noise.pnoise2 ) at (x*scale, y*scale) of every cell in row-major order """
+    return [ function(x*scale, y*scale, **kwargs) for y in range(height) for x in range(width) ]
+
+def Map_Seed(world_seed, coords):
+    """ seed of the map at coords, the same world seed gives the same seeds """
+    key = f"{world_seed}:{','.join(map(str, coords))}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size = 8).digest(), "little") >> 1
+
+def Get_Map_Size(map_type):
+    """ (width, height) of the new maps of this type ( MAP_SIZES ) """
+    return MAP_SIZES.get(map_type, (MAP_WIDTH, MAP_HEIGHT))
 def Get_Map_File_From_Coords(coords = (0,0,0), save_slot=1):
     saves_dir = "./saves"
     map_file = os.path.join(saves_dir, f"map_{'_'.join( map(str, coords) )}_{save_slot}.json")
     return map_file 
 
 # --- mapping
+class TileGridRow: # row view of a TileGrid, keeps grid[y][x] working 
+    __slots__ = ("grid", "y")
+    def __init__(self, grid, y):
+        self.grid = grid 
+        self.y = y 
+    def _index(self, x):
+        width = self.grid.width 
+        if x < 0: x += width 
+        if not 0 <= x < width: raise IndexError("tile grid row index out of range")
+        return self.y*width + x 
+    def __getitem__(self, x):
+        if isinstance(x, slice): return [ self.grid.get_cell(self.y*self.grid.width + i) for i in range(*x.indices(self.grid.width)) ]
+        return self.grid.get_cell(self._index(x))
+    def __setitem__(self, x, tile):
+        self.grid.set_cell(self._index(x), tile)
+    def __len__(self):
+        return self.grid.width 
+    def __iter__(self):
+        start = self.y*self.grid.width 
+        for i in range(start, start + self.grid.width): yield self.grid.get_cell(i)
+
+class TileGrid: # flyweight terrain layer with sparse Tile objects 
+    """ A plain cell ( a Tile without subclass, items, character or stair ) is an index in a palette of 
+    (walkable, blocks_sight, default_sprite_key, cosmetic layers, stamina_consumption) entries, the format of Tile.get_palette_entry. 
+    The Tile object of a cell is materialized on its first access and kept until compact() turns the plain ones back into terrain. 
+    grid[y][x], len(grid) and the iteration by rows work like the list of rows used before. """
+    EMPTY = 0xFFFF # cell without terrain ( materialized, pending or None )
+    def __init__(self, width = 0, height = 0, chunk_size = MAP_CHUNK_SIZE):
+        self.width = width 
+        self.height = height 
+        self.palette = []
+        self.palette_index = {}
+        self.terrain = array('H', [TileGrid.EMPTY]) * (width*height)
+        self.tiles = [None] * (width*height)
+        self.rows = [ TileGridRow(self, y) for y in range(height) ]
+        # chunks : square blocks of chunk_size cells, the tiles which aren't plain of an unloaded chunk are kept as saved dicts 
+        self.chunk_size = chunk_size 
+        self.pending = {} # cell index -> saved dict of the tile 
+        self.pending_chunks = {} # chunk key -> set of the pending cell indexes 
+        self.loader = None # saved dict -> tile ( Map._deserialize ), set by Map_TILES 
+        self.on_chunk_loaded = None # f(tiles) called with the tiles of a chunk loaded by get_cell 
+        # cells whose saved form changed since the last save : set_cell and the tiles ( Tile.mark_changed ), read by Map.get_journal_record 
+        self.dirty_cells = set()
+    @staticmethod
+    def From_Rows(rows):
+        """ grid of a list of rows of tiles, nothing is compacted """
+        grid = TileGrid(len(rows[0]) if rows else 0, len(rows))
+        for y, row in enumerate(rows):
+            grid.tiles[y*grid.width:(y+1)*grid.width] = row 
+        for tile in grid.tiles:
+            if tile is not None: tile.owner = grid 
+        return grid 
+    def get_palette_id(self, entry):
+        entry = (entry[0], entry[1], entry[2], tuple(entry[3]), entry[4])
+        palette_id = self.palette_index.get(entry, None)
+        if palette_id is None:
+            if len(self.palette) >= TileGrid.EMPTY: return None 
+            palette_id = len(self.palette)
+            self.palette.append(entry)
+            self.palette_index[entry] = palette_id 
+        return palette_id 
+    def get_cell(self, i):
+        tile = self.tiles[i]
+        if tile is None:
+            palette_id = self.terrain[i]
+            if palette_id == TileGrid.EMPTY: 
+                if i in self.pending: 
+                    self.load_chunk(self.get_chunk_key(i))
+                    return self.tiles[i]
+                return None 
+            tile = Tile.from_palette_entry(i % self.width, i // self.width, self.palette[palette_id])
+            tile.owner = self 
+            self.tiles[i] = tile 
+            self.terrain[i] = TileGrid.EMPTY 
+        return tile 
+    def set_cell(self, i, tile):
+        if self.pending: self.discard_pending(i)
+        if tile is not None: tile.owner = self 
+        self.tiles[i] = tile 
+        self.terrain[i] = TileGrid.EMPTY 
+        self.dirty_cells.add(i)
+    def set_terrain(self, i, entry):
+        """ the cell becomes the plain tile of the palette entry, False if the palette is full """
+        palette_id = self.get_palette_id(entry)
+        if palette_id is None: return False 
+        if self.pending: self.discard_pending(i)
+        self.tiles[i] = None 
+        self.terrain[i] = palette_id 
+        return True 
+    def get(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height: return self.get_cell(y*self.width + x)
+        return None 
+    def peek(self, i):
+        """ (tile, palette entry) of the cell without materializing it : (None, entry) for terrain, (tile, None) for the tiles which aren't plain, 
+        (None, None) for the empty and the pending cells ( self.pending[i] ) """
+        tile = self.tiles[i]
+        if tile is not None: return tile, tile.get_palette_entry()
+        palette_id = self.terrain[i]
+        return None, (None if palette_id == TileGrid.EMPTY else self.palette[palette_id])
+    def get_lod_key(self, x, y):
+        """ Tile.get_lod_key of the cell without materializing it """
+        if not (0 <= x < self.width and 0 <= y < self.height): return None 
+        i = y*self.width + x 
+        tile, entry = self.peek(i)
+        if tile is not None: return tile.get_lod_key()
+        if entry is None: 
+            tile_dict = self.pending.get(i, None)
+            if tile_dict is None: return None 
+            layers = tile_dict.get("cosmetic_layer_sprite_keys", None)
+            return (tile_dict.get("default_sprite_key", None), layers[-1] if layers else None, None) # items aren't drawn by the lod view 
+        return (entry[2], entry[3][-1] if entry[3] else None, None)
+    def walkable_mask(self):
+        """ bytearray with 1 for the walkable cells in row-major order, nothing is materialized nor loaded """
+        walkable = { palette_id: 1 if entry[0] else 0 for palette_id, entry in enumerate(self.palette) }
+        walkable[TileGrid.EMPTY] = 0
+        mask = bytearray( map(walkable.__getitem__, self.terrain) )
+        for i in compress(range(len(self.tiles)), self.tiles): # materialized cells 
+            mask[i] = 1 if self.tiles[i].walkable else 0 
+        for i, tile_dict in self.pending.items():
+            mask[i] = 1 if tile_dict.get("walkable", False) else 0 
+        return mask 
+    def get_chunk_key(self, i):
+        return ( (i % self.width) // self.chunk_size, (i // self.width) // self.chunk_size )
+    def get_chunk_keys(self):
+        return set( product(range(-(-self.width // self.chunk_size)), range(-(-self.height // self.chunk_size))) )
+    def get_chunk_cells(self, key):
+        """ cell indexes of the chunk, row by row """
+        cx, cy = key 
+        x1, y1 = cx*self.chunk_size, cy*self.chunk_size 
+        x2, y2 = min(x1 + self.chunk_size, self.width), min(y1 + self.chunk_size, self.height)
+        return [ i for y in range(y1, y2) for i in range(y*self.width + x1, y*self.width + x2) ]
+    def set_pending(self, i, tile_dict):
+        """ the cell becomes the saved dict of a tile, deserialized when its chunk is loaded """
+        self.tiles[i] = None 
+        self.terrain[i] = TileGrid.EMPTY 
+        self.pending[i] = tile_dict 
+        self.pending_chunks.setdefault(self.get_chunk_key(i), set()).add(i)
+    def discard_pending(self, i):
+        if self.pending.pop(i, None) is None: return 
+        key = self.get_chunk_key(i)
+        cells = self.pending_chunks[key]
+        cells.discard(i)
+        if not cells: del self.pending_chunks[key]
+    def load_chunk(self, key):
+        """ deserialize the pending tiles of the chunk, return them """
+        cells = self.pending_chunks.pop(key, None)
+        if not cells: return []
+        loaded = []
+        for i in sorted(cells):
+            tile = self.loader(self.pending.pop(i))
+            self.tiles[i] = tile 
+            if tile is not None: 
+                tile.owner = self 
+                loaded.append(tile)
+        if self.on_chunk_loaded is not None: self.on_chunk_loaded(loaded)
+        return loaded 
+    def unload_chunk(self, key):
+        """ plain tiles of the chunk become terrain, the others become pending dicts, except the tiles of the characters. 
+        Returns the tiles moved to pending. """
+        unloaded = []
+        for i in self.get_chunk_cells(key):
+            tile = self.tiles[i]
+            if tile is None or tile.current_char is not None: continue 
+            entry = tile.get_palette_entry()
+            if entry is not None and self.set_terrain(i, entry): continue 
+            self.set_pending(i, tile.to_dict())
+            unloaded.append(tile)
+        return unloaded 
+    def materialized(self):
+        """ (x, y, tile) of the materialized tiles in row-major order """
+        width = self.width 
+        for i, tile in enumerate(self.tiles):
+            if tile is not None: yield i % width, i // width, tile 
+    def count_materialized(self):
+        return len(self.tiles) - self.tiles.count(None)
+    def compact(self):
+        """ turn the materialized plain tiles without character back into terrain, return how many """
+        count = 0
+        for i, tile in enumerate(self.tiles):
+            if tile is None or tile.current_char is not None: continue 
+            entry = tile.get_palette_entry()
+            if entry is not None and self.set_terrain(i, entry): count += 1
+        return count 
+    def __getitem__(self, y):
+        return self.rows[y]
+    def __len__(self):
+        return self.height 
+    def __iter__(self):
+        return iter(self.rows)
+
+class TerrainBuffer: # integer terrain of a map being generated 
+    """ One byte per cell with the index of a palette entry ( the format of Tile.get_palette_entry ), EMPTY is a cell without tile. 
+    The generation steps of Map_MODELLING fill rectangles and stamp lists of cells, to_tile_grid() builds the TileGrid 
+    once at the end and the cells are terrain of the grid, no Tile object is created for them. """
+    EMPTY = 0xFF
+    def __init__(self, width, height):
+        self.width = width 
+        self.height = height 
+        self.entries = []
+        self.entry_ids = {}
+        self.cells = array('B', [TerrainBuffer.EMPTY]) * (width*height)
+    @staticmethod
+    def Entry(sprite_key, walkable):
+        """ palette entry of Tile(walkable = walkable, sprite_key = sprite_key) """
+        return (walkable, not walkable, sprite_key, (), 4.0)
+    def get_id(self, entry):
+        entry_id = self.entry_ids.get(entry, None)
+        if entry_id is None:
+            if len(self.entries) >= TerrainBuffer.EMPTY: raise ValueError("terrain buffer palette is full")
+            entry_id = len(self.entries)
+            self.entries.append(entry)
+            self.entry_ids[entry] = entry_id 
+        return entry_id 
+    def get_ids(self, f_filter):
+        """ set of the ids whose entry passes f_filter(entry) """
+        return { entry_id for entry_id, entry in enumerate(self.entries) if f_filter(entry) }
+    def in_grid(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height 
+    def get_entry(self, x, y):
+        if not self.in_grid(x, y): return None 
+        entry_id = self.cells[y*self.width + x]
+        return None if entry_id == TerrainBuffer.EMPTY else self.entries[entry_id]
+    def is_walkable(self, x, y):
+        entry = self.get_entry(x, y)
+        return entry is not None and entry[0]
+    def fill(self, entry, x1, x2, y1, y2):
+        """ rectangle [x1, x2) x [y1, y2), clipped to the buffer """
+        x1, x2, y1, y2 = max(0, x1), min(self.width, x2), max(0, y1), min(self.height, y2)
+        if x1 >= x2: return 
+        run = array('B', [self.get_id(entry)]) * (x2 - x1)
+        for y in range(y1, y2):
+            self.cells[y*self.width + x1 : y*self.width + x2] = run 
+    def stamp(self, entry, indexes):
+        """ set the cells of a list of row-major indexes """
+        entry_id = self.get_id(entry)
+        cells = self.cells 
+        for i in indexes: cells[i] = entry_id 
+    def to_tile_grid(self):
+        grid = TileGrid(self.width, self.height)
+        for entry in self.entries: grid.get_palette_id(entry) # same order, the buffer ids are the palette ids of the new grid 
+        if TerrainBuffer.EMPTY in self.cells:
+            grid.terrain = array('H', ( TileGrid.EMPTY if c == TerrainBuffer.EMPTY else c for c in self.cells ))
+        else:
+            grid.terrain = array('H', self.cells)
+        return grid 
+
 class Room:
     def __init__(self):
         self.positions = [] # (x,y) tuples walkable or not
@@ -93,17 +355,28 @@ class Room:
     def add_random_loot(self, loot_table):
         pass 
 
-class Map_MODELLING:
+# Map_MODELLING.commit_terrain() || { TerrainBuffer.to_tile_grid() } || {}
+class Map_MODELLING: # the terrain steps write self.terrain_buffer, commit_terrain() turns it into the grid 
     def __init__(self):
-        pass 
+        self.terrain_buffer = None 
+        self.rng = random.Random() # the generation and the fills (buildings, enemies, spawners) draw from rng, Map.generate_terrain seeds it and noise_base 
+        self.noise_base = 0 
+    def get_terrain_buffer(self):
+        if self.terrain_buffer is None: self.terrain_buffer = TerrainBuffer(self.width, self.height)
+        return self.terrain_buffer 
+    def commit_terrain(self):
+        """ the grid becomes the terrain generated so far, the steps placing tiles, items or buildings run afterwards """
+        if self.terrain_buffer is None: return 
+        self.grid = self.terrain_buffer.to_tile_grid()
+        self.terrain_buffer = None 
     def grid_init_uniform(self, spriteKey = "grass", is_walkable = True, x1 = 0, x2 = None, y1 = 0, y2 = None):
         if not x2: x2 = self.width
         if not y2: y2 = self.height 
-        if not self.grid:
-            self.grid = [ [ Tile(i,j,walkable=is_walkable, sprite_key=spriteKey) for i in range(0,self.width) ] for j in range(0,self.height) ]
-        for i in range(x1,x2):
-            for j in range(y1,y2):
-                self.grid[j][i] = Tile(i,j, walkable=is_walkable, sprite_key=spriteKey)
+        self.get_terrain_buffer().fill(TerrainBuffer.Entry(spriteKey, is_walkable), x1, x2, y1, y2)
+    
+    def fill_segment(self, x1, y1, x2, y2, entry):
+        """ horizontal or vertical segment, both ends included """
+        self.get_terrain_buffer().fill(entry, min(x1, x2), max(x1, x2) + 1, min(y1, y2), max(y1, y2) + 1)
     
     def add_rectangle(self, center_x, center_y, width, height, has_entry = True, sprite_border="wall", sprite_floor="floor"):
         """ Generate a room with one floor-tile entry only changing his limits """
@@ -114,28 +387,20 @@ class Map_MODELLING:
         for i in range(len(self.rooms) - 1):
             x1, y1 = self.rooms[i][0] + self.rooms[i][2] // 2, self.rooms[i][1] + self.rooms[i][3] // 2
             x2, y2 = self.rooms[i + 1][0] + self.rooms[i + 1][2] // 2, self.rooms[i + 1][1] + self.rooms[i + 1][3] // 2
-            if random.choice([True, False]):
-                for x in range(min(x1, x2), max(x1, x2) + 1):
-                    self.grid[y1][x] = Tile(x, y1, walkable=True, sprite_key=sprite_corridor_floor)
-                for y in range(min(y1, y2), max(y1, y2) + 1):
-                    self.grid[y][x2] = Tile(x2, y, walkable=True, sprite_key=sprite_corridor_floor)
-            else:
-                for y in range(min(y1, y2), max(y1, y2) + 1):
-                    self.grid[y][x1] = Tile(x1, y, walkable=True, sprite_key=sprite_corridor_floor)
-                for x in range(min(x1, x2), max(x1, x2) + 1):
-                    self.grid[y2][x] = Tile(x, y2, walkable=True, sprite_key=sprite_corridor_floor)
+            self.carve_corridor(x1, y1, x2, y2, sprite_key = sprite_corridor_floor)
     
-    def add_rooms(self, num_rooms = random.randint(8, 15)):
+    def add_rooms(self, num_rooms = None):
         # Generate rooms () || & Generate Enough Rooms || $ (bool) Check if Overlaps | % not overlap || Add Room 
         # Generate rooms () || & Generate Enough Rooms || $ (bool) Check if Overlaps || Set overlap false | & x,y,w,h : over other rooms || % Overlaps || Set overlap true | break 
+        if num_rooms is None: num_rooms = self.rng.randint(8, 15)
         self.rooms = []
         max_attempts = num_rooms * 10
         attempts = 0
         while len(self.rooms) < num_rooms and attempts < max_attempts:
-            room_w = random.randint(5, 10)
-            room_h = random.randint(5, 10)
-            room_x = random.randint(1, self.width - room_w - 1)
-            room_y = random.randint(1, self.height - room_h - 1)
+            room_w = self.rng.randint(5, 10)
+            room_h = self.rng.randint(5, 10)
+            room_x = self.rng.randint(1, self.width - room_w - 1)
+            room_y = self.rng.randint(1, self.height - room_h - 1)
             overlap = False
             for other_x, other_y, other_w, other_h in self.rooms:
                 if (room_x < other_x + other_w + 2 and
@@ -202,68 +467,66 @@ class Map_MODELLING:
         return None
 
     def repaint_floor_rooms(self, sprite = "floor"):
-        def inner_function(tile,i,j):
-            if not tile: return None
-            if tile.stair: return None
-            self.set_tile(i,j,Tile(walkable=True, sprite_key=sprite))
-            return None
-        self.foreach_rooms_tiles(inner_function)
+        entry = TerrainBuffer.Entry(sprite, True)
+        for x,y,w,h in self.rooms:
+            self.get_terrain_buffer().fill(entry, x, x+w, y, y+h)
 
     def add_patches(self, spriteKey = "dirt", is_walkable = True, scale = 0.1):
         # Generate dirt patches using Perlin noise or random clusters
-        for i in range(self.width):
-            for j in range(self.height):
-                noise_value = noise.snoise2(i * scale, j * scale, octaves=1)  # Adjust scale (0.1) for patch size
-                if noise_value > 0.2:  # Threshold for dirt
-                    self.grid[j][i] = Tile(i,j,walkable=is_walkable, sprite_key=spriteKey)
+        field = Noise_Field(noise.snoise2, self.width, self.height, scale, octaves=1, base=self.noise_base) # Adjust scale (0.1) for patch size
+        self.get_terrain_buffer().stamp(TerrainBuffer.Entry(spriteKey, is_walkable), [ i for i, value in enumerate(field) if value > 0.2 ]) # Threshold for dirt
         
     def add_trees(self):
         # Add trees with slight clustering
-        for i in range(1, self.width-1):
-            for j in range(1, self.height-1):
+        buffer = self.get_terrain_buffer()
+        tree_id = buffer.get_id(TerrainBuffer.Entry("tree", False))
+        tree_ids = buffer.get_ids(lambda entry: entry[2] == "tree")
+        cells, width, height = buffer.cells, self.width, self.height 
+        for i in range(1, width-1):
+            for j in range(1, height-1):
                 # Base chance for a tree
                 tree_chance = 0.15
                 # Increase chance if neighboring tiles have trees (clustering)
                 for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    if 0 <= i + di < 100 and 0 <= j + dj < 100:
-                        if self.grid[j + dj][i + di].default_sprite_key == "tree":
-                            tree_chance += 0.1
-                if random.random() < tree_chance:
-                    self.grid[j][i] = Tile(i,j,walkable=False, sprite_key="tree")
+                    if cells[(j + dj)*width + i + di] in tree_ids:
+                        tree_chance += 0.1
+                if self.rng.random() < tree_chance:
+                    cells[j*width + i] = tree_id 
     
     def add_rocks(self, spriteKey = "rock", is_walkable=False):
+        water, rocks = [], []
         for i in range(1, self.width-1):
             for j in range(1, self.height-1):
-                if random.random() < 0.001:  # 2% chance for water
-                    self.grid[j][i] = Tile(i,j, walkable=False, sprite_key="water")
-                elif random.random() < 0.05:  # 5% chance for rocks
-                    self.grid[j][i] = Tile(i,j, walkable=is_walkable, sprite_key=spriteKey)
+                if self.rng.random() < 0.001:  # 2% chance for water
+                    water.append(j*self.width + i)
+                elif self.rng.random() < 0.05:  # 5% chance for rocks
+                    rocks.append(j*self.width + i)
+        self.get_terrain_buffer().stamp(TerrainBuffer.Entry("water", False), water)
+        self.get_terrain_buffer().stamp(TerrainBuffer.Entry(spriteKey, is_walkable), rocks)
     
     def carve_corridor(self, x1, y1, x2, y2, sprite_key="dirt"):
-        if random.choice([True, False]):
-            for x in range(min(x1, x2), max(x1, x2) + 1):
-                self.grid[y1][x] = Tile(x, y1, walkable=True, sprite_key=sprite_key)
-            for y in range(min(y1, y2), max(y1, y2) + 1):
-                self.grid[y][x2] = Tile(x2, y, walkable=True, sprite_key=sprite_key)
+        entry = TerrainBuffer.Entry(sprite_key, True)
+        if self.rng.choice([True, False]):
+            self.fill_segment(x1, y1, x2, y1, entry)
+            self.fill_segment(x2, y1, x2, y2, entry)
         else:
-            for y in range(min(y1, y2), max(y1, y2) + 1):
-                self.grid[y][x1] = Tile(x1, y, walkable=True, sprite_key=sprite_key)
-            for x in range(min(x1, x2), max(x1, x2) + 1):
-                self.grid[y2][x] = Tile(x, y2, walkable=True, sprite_key=sprite_key)
+            self.fill_segment(x1, y1, x1, y2, entry)
+            self.fill_segment(x1, y2, x2, y2, entry)
                 
     def ensure_connection(self, target_points = None):
         if not self.rooms:
             print("No rooms to connect entrance.")
             return
         if not target_points:
+            is_walkable = self.get_terrain_buffer().is_walkable 
             target_points = [
-                (x, 0) for x in range(self.width) if self.grid[0][x].walkable  # Top edge
+                (x, 0) for x in range(self.width) if is_walkable(x, 0)  # Top edge
             ] + [
-                (x, self.height - 1) for x in range(self.width) if self.grid[self.height - 1][x].walkable  # Bottom edge
+                (x, self.height - 1) for x in range(self.width) if is_walkable(x, self.height - 1)  # Bottom edge
             ] + [
-                (0, y) for y in range(self.height) if self.grid[y][0].walkable  # Left edge
+                (0, y) for y in range(self.height) if is_walkable(0, y)  # Left edge
             ] + [
-                (self.width - 1, y) for y in range(self.height) if self.grid[y][self.width - 1].walkable  # Right edge
+                (self.width - 1, y) for y in range(self.height) if is_walkable(self.width - 1, y)  # Right edge
             ]
 
         def distance(p1, p2):
@@ -287,7 +550,7 @@ class Map_SPECIAL:
     def __init__(self):
         pass 
     def add_enemy_mill(self, probability = 0.3, border_factor = 0.0, quantity = 1):
-        if d() > probability: return False
+        if self.rng.random() > probability: return False
         for i in range(quantity):
             xy = self.get_random_walkable_tile(border_factor = border_factor) # -- performance check 
             if not xy: continue 
@@ -299,7 +562,7 @@ class Map_SPECIAL:
             print("Added Mill at", xy[0], xy[1])
         return True 
     def add_enemy_lumber_mill(self, probability = 0.3, border_factor = 0.0, quantity = 1):
-        if d() > probability: return False
+        if self.rng.random() > probability: return False
         for i in range(quantity):
             xy = self.get_random_walkable_tile(border_factor = border_factor) # -- performance check 
             if not xy: continue 
@@ -311,7 +574,7 @@ class Map_SPECIAL:
             print("Added Lumber Mill at", xy[0], xy[1])
         return True 
     def add_enemy_tower(self, probability = 0.3, border_factor = 0.0, quantity = 1, floor_sprite = "grass"):
-        if d() > probability: return False
+        if self.rng.random() > probability: return False
         for i in range(quantity):
             xy = self.get_random_walkable_tile(border_factor = border_factor) # -- performance check 
             if not xy: continue 
@@ -323,7 +586,7 @@ class Map_SPECIAL:
             print("Added Tower at", xy[0], xy[1])
         return True 
     def add_magic_tower(self, probability = 0.3, border_factor = 0.0, quantity = 1, floor_sprite = "grass"):
-        if d() > probability: return False
+        if self.rng.random() > probability: return False
         for i in range(quantity):
             xy = self.get_random_walkable_tile(border_factor = border_factor) # -- performance check 
             if not xy: continue 
@@ -334,7 +597,7 @@ class Map_SPECIAL:
             print("Added Magic Tower at", xy[0], xy[1])
         return True     
     def add_dungeon_entrance(self, probability = 1.0, border_factor = 0.0):
-        coin = random.random()
+        coin = self.rng.random()
         if coin > probability: return False
         xy = self.get_random_walkable_tile(border_factor = border_factor)
         if not xy: return False
@@ -365,24 +628,20 @@ class Map_SPECIAL:
             if char_:
                 tile.current_char = char_
                 char_.current_tile = tile
-            # Save the map to persist the stair
-            saves_dir = "./saves"
-            map_file = os.path.join(saves_dir, f"map_{'_'.join(map(str, self.coords))}_1.json")
-            self.Save_JSON(map_file)
             return True
         return False
     def add_dungeon_loot(self, k=20):
         # -> add_dungeon_loot () || $ Sample | & (Tile) X : Sample || Random Choice in Loot Table || Add to X the Loot 
         Sampled_Tiles = self.get_random_tiles_from_rooms(k=k)
         for tile in Sampled_Tiles:
-            LootKwargs = random.choice(LOOT_TABLE)
-            tile[0].add_item_by_chance(**LootKwargs)
+            LootKwargs = self.rng.choice(LOOT_TABLE)
+            tile[0].add_item_by_chance(rng = self.rng, **LootKwargs)
     def add_stair_down_by_chance(self, probability = 0.5, excluded = None):
         if not excluded: excluded = set()
-        if d() > probability: return 
+        if self.rng.random() > probability: return 
         available_rooms = [(rx, ry, rw, rh) for rx, ry, rw, rh in self.rooms if not (rx + rw // 2, ry + rh // 2) in excluded ]
         if available_rooms:
-            down_room = random.choice(available_rooms)
+            down_room = self.rng.choice(available_rooms)
             down_x = down_room[0] + down_room[2] // 2
             down_y = down_room[1] + down_room[3] // 2
             x,y,z = self.coords 
@@ -397,9 +656,16 @@ class Map_CHARACTERS:
     def __init__(self):
         self.enemy_type = "default" # used for fill_enemies to know which type of enemies should spawn. 
         self.enemies = []
+        # changes since the last save ( Map.get_journal_record ) : dirty_fields when the fields or the list of enemies changed, 
+        # dirty_enemies for the enemies moved or updated, saved alone while the list is the same 
+        self.dirty_fields = False 
+        self.dirty_enemies = set()
         self.enemy_counters = {} 
         self.enemy_buildings = set()
         self.friendly_buildings = set()
+    def add_enemy(self, enemy):
+        self.enemies.append(enemy)
+        self.dirty_fields = True 
     def get_enemy_count(self, name = None):
         if name is None:
             S = 0
@@ -443,7 +709,7 @@ class Map_CHARACTERS:
             enemy = self.generate_enemy_by_chance_by_list_at(center_x + dx, center_y + dy, RAIDERS_TABLE)
             if enemy:
                 print("Raider Generated",center_x + dx, center_y + dy) 
-                self.enemies.append(enemy)
+                self.add_enemy(enemy)
                 self.place_character(enemy) 
                 b_at_least_one = True 
         return b_at_least_one
@@ -494,7 +760,7 @@ class Map_CHARACTERS:
                 return None
         if extra_items is None:
             extra_items = [] 
-        if d(0.0,1.0) < chance:
+        if self.rng.uniform(0.0,1.0) < chance:
             enemy_instance = enemy(x=x, y=y, **kwargs)
             for kw in extra_items:
                 enemy_instance.add_item_by_chance(**kw)
@@ -538,14 +804,14 @@ class Map_CHARACTERS:
     def generate_and_place_enemy_by_list_at(self, x,y, enemy_list):
         enemy = self.generate_enemy_by_chance_by_list_at(x=x,y=y, enemy_list=enemy_list)
         if not enemy: return False 
-        self.enemies.append(enemy)
+        self.add_enemy(enemy)
         return self.place_character(enemy)
     def generate_enemy_at(self, x,y, enemy_class=None, *args, **kwargs):
         if enemy_class:
             enemy = enemy_class(x=x,y=y,*args, **kwargs)
-            self.enemies.append(enemy)
+            self.add_enemy(enemy)
             return self.place_character(enemy)
-        coin = random.uniform(0,1)
+        coin = self.rng.uniform(0,1)
         enemy = None
         match self.enemy_type:    
             case "dungeon":
@@ -563,7 +829,7 @@ class Map_CHARACTERS:
             case _:
                 enemy = Zombie("Zombie",x=x,y=y,b_generate_items=True)
         if not enemy: return False
-        self.enemies.append(enemy)
+        self.add_enemy(enemy)
         return self.place_character(enemy)
     def fill_enemies(self, num_enemies=100):
         def check_tile(x,y):
@@ -576,8 +842,8 @@ class Map_CHARACTERS:
         attempts = 0
         max_attempts = num_enemies * 5
         while placed < num_enemies and attempts < max_attempts:
-            x = random.randint(1, self.width - 1)
-            y = random.randint(1, self.height - 1)
+            x = self.rng.randint(1, self.width - 1)
+            y = self.rng.randint(1, self.height - 1)
             x_ = x 
             y_ = y
             for dx,dy in ADJACENT_DIFF_MOVES:
@@ -602,41 +868,41 @@ class Map_CHARACTERS:
     def get_random_spawner(self):
         match self.enemy_type:    
             case "dungeon":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner
                 ] )
             case "deep_forest":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner,
                     new_demon_spawner
                 ] )
             case "field":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner,
                     new_enemy_tower_spawner
                 ] )
             case "default":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner
                 ] )
             case "road":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner,
                     new_enemy_tower_spawner
                 ] )
             case "lake":
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner,
                     new_demon_spawner
                 ] )
             case _:
-                return random.choice( [
+                return self.rng.choice( [
                     new_zombie_spawner,
                     new_rogue_spawner
                 ] )
@@ -646,8 +912,8 @@ class Map_CHARACTERS:
         attempts = 0
         max_attempts = num_spawners * 5
         while placed < num_spawners and attempts < max_attempts:
-            x = random.randint(1, self.width - 1)
-            y = random.randint(1, self.height - 1)
+            x = self.rng.randint(1, self.width - 1)
+            y = self.rng.randint(1, self.height - 1)
             tile = self.get_tile(x, y)
             if not self.has_adjacent_walkable_can_place_character(tile=tile, x=x, y=y): 
                 attempts += 1
@@ -680,10 +946,12 @@ class Map_CHARACTERS:
         self.reset_enemy_counters()
         for enemy in self.enemies:
             self.update_enemy_counters_by_iteration(enemy)
+            if not self.is_active_xy(enemy.x, enemy.y): continue # far from the players ( update_chunks ) 
             if T>PERFORMANCE_TIME or flag_performance: 
                 if T>PERFORMANCE_TIME: game_instance.flag_performance_enemies = True  
                 if player.distance(enemy) > PERFORMANCE_DISTANCE: continue 
             enemy.behaviour_update(game_instance) 
+            self.dirty_enemies.add(enemy)
             dt = toc(t)[0] 
             t += dt 
             T += dt 
@@ -703,6 +971,7 @@ class Map_CHARACTERS:
             if tile and tile.walkable and not tile.current_char:
                 tile.current_char = char
                 char.current_tile = tile
+                self.dirty_enemies.add(char) # only the enemies are saved by the map 
                 if isinstance(char, Player): 
                     char.current_map = self.coords
                 return True
@@ -717,6 +986,7 @@ class Map_CHARACTERS:
             if tile and tile.current_char == char:
                 if char in self.enemies:
                     self.enemies.remove(char)
+                    self.dirty_fields = True 
                 tile.current_char = None
                 char.current_tile = None
                 print(f"Removed {char.name} from ({char.x}, {char.y})")
@@ -875,16 +1145,149 @@ class Map_CHARACTERS:
         return True    
     def in_grid(self,x,y):
         return (0 <= x < self.width and 0 <= y < self.height)
+# Map_TILES.update_chunks() || { TileGrid.load_chunk() | TileGrid.unload_chunk() } || { .on_chunk_loaded() | .on_chunk_unloaded() }
 class Map_TILES:
+    @property
+    def grid(self):
+        return self._grid 
+    @grid.setter
+    def grid(self, rows):
+        """ accepts a TileGrid or a list of rows of tiles """
+        self._grid = rows if isinstance(rows, TileGrid) else TileGrid.From_Rows(rows)
+        self._grid.loader = lambda tile_dict: self._deserialize(tile_dict, None)
+        self._grid.on_chunk_loaded = self.on_chunk_loaded 
+        self.active_chunks = None # chunks near the players ( update_chunks ), None until the first update : everything is active 
+        self.loaded_chunks = None # chunks which may have materialized tiles, None for all 
     def __init__(self):
         self.buildings = []
         self.last_building_target = None # for performance improve in artificial behaviour 
         self.last_enemy_building_target = None # for performance improve in artificial behaviour 
         self.spawners = []
+    def encode_grid(self):
+        """ compact grid format : a palette of plain tile signatures, the run-length encoded palette indices in row-major order 
+        ("index*count" tokens, "-" for the other tiles) and the full dicts of the tiles which aren't plain (buildings, spawners, stairs, items) """
+        palette, palette_index, special, tokens = [], {}, [], []
+        previous, count = None, 0
+        grid = self.grid 
+        for i in range(grid.width*grid.height):
+            tile, entry = grid.peek(i)
+            if entry is None:
+                token = "-"
+                if tile: 
+                    special.append([i % grid.width, i // grid.width, tile.to_dict()])
+                elif i in grid.pending: 
+                    special.append([i % grid.width, i // grid.width, grid.pending[i]])
+            else:
+                token = palette_index.get(entry, None)
+                if token is None:
+                    token = str(len(palette))
+                    palette_index[entry] = token
+                    palette.append([entry[0], entry[1], entry[2], list(entry[3]), entry[4]])
+            if token == previous:
+                count += 1
+                continue 
+            if previous is not None: tokens.append(previous if count == 1 else f"{previous}*{count}")
+            previous, count = token, 1
+        if previous is not None: tokens.append(previous if count == 1 else f"{previous}*{count}")
+        return {
+            "version": 1,
+            "palette_fields": ["walkable", "blocks_sight", "default_sprite_key", "cosmetic_layer_sprite_keys", "stamina_consumption"],
+            "palette": palette, 
+            "runs": ",".join(tokens), 
+            "special": special
+        }
+    def decode_grid(self, compact):
+        """ inverse of encode_grid, the map width and height must be already loaded. The special tiles stay pending until their chunk is loaded. """
+        grid = TileGrid(self.width, self.height)
+        palette_ids = [ grid.get_palette_id(entry) for entry in compact["palette"] ]
+        position = 0
+        for token in compact["runs"].split(","):
+            index, _, count = token.partition("*")
+            count = int(count) if count else 1
+            if index != "-":
+                palette_id = palette_ids[int(index)]
+                grid.terrain[position:position + count] = array('H', [palette_id]) * count 
+            position += count 
+        for x, y, tile_dict in compact["special"]:
+            grid.set_pending(y*self.width + x, tile_dict)
+        return grid 
+    def get_cell_entry(self, i):
+        """ saved form of the cell : the palette entry as a list for the plain tiles, to_dict of the others, the saved dict of the pending ones, None for the empty cells """
+        tile, entry = self.grid.peek(i)
+        if entry is not None: return [entry[0], entry[1], entry[2], list(entry[3]), entry[4]]
+        if tile is not None: return tile.to_dict()
+        return self.grid.pending.get(i, None)
+    def get_dirty_tiles(self):
+        """ [x, y, entry] of the cells changed since the last save ( TileGrid.dirty_cells ) """
+        return [ [i % self.width, i // self.width, self.get_cell_entry(i)] for i in sorted(self.grid.dirty_cells) ]
+    def apply_tile_patches(self, patches):
+        """ inverse of get_dirty_tiles and get_seed_delta, replace the tiles of the grid, the tile dicts stay pending until their chunk is loaded """
+        for x, y, entry in patches:
+            if entry is None:
+                self.grid[y][x] = None 
+            elif isinstance(entry, list):
+                self.grid.set_terrain(y*self.width + x, entry)
+            else:
+                self.grid.set_pending(y*self.width + x, entry)
+    def get_spawner_count(self):
+        """ spawners of the map, loaded or not """
+        return len(self.spawners) + sum( 1 for tile_dict in self.grid.pending.values() if issubclass(self.get_pending_class(tile_dict), Spawner) )
+    def get_pending_class(self, tile_dict):
+        return self._get_class_by_name(tile_dict.get("class_name", None)) or Tile 
+    def get_chunks_near(self, positions, distance):
+        """ keys of the chunks at most distance chunks away from the chunks of the positions """
+        size = self.grid.chunk_size 
+        max_cx, max_cy = (self.width - 1) // size, (self.height - 1) // size 
+        keys = set()
+        for x, y in positions:
+            cx, cy = x // size, y // size 
+            keys.update(product(range(max(0, cx - distance), min(max_cx, cx + distance) + 1), range(max(0, cy - distance), min(max_cy, cy + distance) + 1)))
+        return keys 
+    def update_chunks(self, positions):
+        """ load the chunks within MAP_CHUNK_ACTIVE_DISTANCE of the positions (x, y) of the players, they are the simulated ones ( is_active_xy ). 
+        The chunks further than one more chunk are unloaded : their buildings, spawners and items wait as saved dicts in grid.pending. """
+        if not self.is_chunked(): return 
+        active = self.get_chunks_near(positions, MAP_CHUNK_ACTIVE_DISTANCE)
+        if active == self.active_chunks: return 
+        for key in active: self.grid.load_chunk(key)
+        kept = self.get_chunks_near(positions, MAP_CHUNK_ACTIVE_DISTANCE + 1) # the border stays loaded, walking along it doesn't reload 
+        loaded = self.grid.get_chunk_keys() if self.loaded_chunks is None else self.loaded_chunks 
+        unloaded = []
+        for key in loaded - kept: unloaded += self.grid.unload_chunk(key)
+        if unloaded: self.on_chunk_unloaded(unloaded)
+        self.active_chunks = active 
+        self.loaded_chunks = (loaded & kept) | active 
+    def is_chunked(self):
+        """ False when every chunk is within MAP_CHUNK_ACTIVE_DISTANCE of any position ( MAP_WIDTH x MAP_HEIGHT with the default sizes ) : 
+        the map is loaded and simulated whole and update_chunks does nothing """
+        size, span = self.grid.chunk_size, MAP_CHUNK_ACTIVE_DISTANCE + 1 
+        return -(-self.width // size) > span or -(-self.height // size) > span 
+    def is_active_xy(self, x, y):
+        if self.active_chunks is None: return True 
+        size = self.grid.chunk_size 
+        return (x // size, y // size) in self.active_chunks 
+    def on_chunk_loaded(self, tiles):
+        for tile in tiles:
+            if isinstance(tile, Spawner): self.spawners.append(tile)
+            if isinstance(tile, TileBuilding): 
+                self.buildings.append(tile)
+                self.update_buildings_sets_iteration(tile)
+        if self.loaded_chunks is not None: self.loaded_chunks.update( self.grid.get_chunk_key(tile.y*self.width + tile.x) for tile in tiles )
+    def on_chunk_unloaded(self, tiles):
+        removed = set(tiles)
+        self.spawners = [ tile for tile in self.spawners if tile not in removed ]
+        self.buildings = [ tile for tile in self.buildings if tile not in removed ]
+        self.enemy_buildings -= removed 
+        self.friendly_buildings -= removed 
+        if self.last_building_target in removed: self.last_building_target = None 
+        if self.last_enemy_building_target in removed: self.last_enemy_building_target = None 
+        characters = set(self.enemies) | { tile.current_char for _, _, tile in self.grid.materialized() if tile.current_char } # the players and their party too 
+        for char in characters:
+            if getattr(char, "current_target_building", None) in removed: char.current_target_building = None 
     def update_spawners_list(self):
-        self.spawners = [ self.grid[y][x] for y in range(self.height) for x in range(self.width) if isinstance(self.grid[y][x], Spawner) ]
+        self.spawners = [ tile for _, _, tile in self.grid.materialized() if isinstance(tile, Spawner) ]
     def update_buildings_list(self):
-        self.buildings = [ self.grid[y][x] for y in range(self.height) for x in range(self.width) if isinstance(self.grid[y][x], TileBuilding) ]
+        self.buildings = [ tile for _, _, tile in self.grid.materialized() if isinstance(tile, TileBuilding) ]
     def update_buildings_sets(self):
         if not self.buildings or len(self.buildings)==0: 
             self.enemy_buildings.clear()
@@ -907,7 +1310,10 @@ class Map_TILES:
     def get_random_tile_from_rooms(self):
         return GetRandomTile_Reservoir_Sampling( self, Map.foreach_rooms_tiles )
     def get_random_tiles_from_rooms(self, k=20):
-        return GetRandomTiles_Reservoir_Sampling( self, Map.foreach_rooms_tiles, k=k )
+        """ (tile, i, j) of k distinct cells of the rooms, only the sampled tiles are materialized """
+        if not self.rooms or k <= 0: return []
+        cells = [ (i, j) for x,y,w,h in self.rooms for i,j in product(range(x,x+w), range(y,y+h)) ]
+        return [ (self.get_tile(i, j), i, j) for i, j in self.rng.sample(cells, min(k, len(cells))) ]
     def is_xy_special(self,x,y):
         tile = self.get_tile(x,y)
         if not tile: return False
@@ -935,17 +1341,29 @@ class Map_TILES:
             if tile_2:
                 if not tile_2.walkable: return False
         return True
+    def get_adjacent_walkable_mask(self):
+        """ is_adjacent_walkable of every cell as a bytearray in row-major order. 
+        The masks are big integers with one byte per cell, a shift by the offset of a neighbour moves its blocked flag to the cell. """
+        width, size = self.width, self.width*self.height 
+        ones = int.from_bytes(b"\x01" * size, "little")
+        blocked = ones ^ int.from_bytes(self.grid.walkable_mask(), "little")
+        bad = 0
+        for dx,dy in CROSS_DIFF_MOVES:
+            offset = dy*width + dx 
+            shifted = blocked >> (offset*8) if offset > 0 else blocked << (-offset*8)
+            if dx: shifted &= int.from_bytes(bytes( 1 if 0 <= x+dx < width else 0 for x in range(width) ) * self.height, "little") # same row 
+            bad |= shifted 
+        return bytearray( (ones & ~bad).to_bytes(size, "little") )
     def get_random_walkable_tile(self, border_factor = 0.0):
         dx = int(border_factor*self.width)
         dy = int(border_factor*self.height)
-        walkable_tiles = [(i, j) for j in range(dy,self.height-dy) for i in range(dx,self.width-dx) if self.is_adjacent_walkable(self.grid[j][i],i,j) ]
+        mask = self.get_adjacent_walkable_mask()
+        walkable_tiles = [(i, j) for j in range(dy,self.height-dy) for i in range(dx,self.width-dx) if mask[j*self.width + i] ]
         if not walkable_tiles: return None
-        return random.choice(walkable_tiles)
+        return self.rng.choice(walkable_tiles)
     def get_tile(self, x, y):
         try:
-            if 0 <= y < len(self.grid) and 0 <= x < len(self.grid[0]):
-                return self.grid[y][x]
-            return None
+            return self.grid.get(x, y)
         except Exception as e:
             print(f"Error accessing tile ({x}, {y}): {e}")
             return None
@@ -959,14 +1377,13 @@ class Map_TILES:
         return "grass"  # Fallback if no match found    
     def find_stair_tile_xy(self, target_stair_coords):
         """Find a tile in map_obj with a stair attribute matching target_stair_coords."""
-        for y in range(self.height):
-            for x in range(self.width):
-                tile = self.get_tile(x, y)
-                if tile and tile.stair == target_stair_coords:
-                    return (x, y)
+        for x, y, tile in self.grid.materialized(): # terrain cells have no stairs 
+            if tile.stair == target_stair_coords: return (x, y)
+        for i, tile_dict in self.grid.pending.items():
+            if self._deserialize(tile_dict.get("stair", None), None) == target_stair_coords: return (i % self.width, i // self.width)
         return None
 class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
-    __serialize_only__ = Map_CHARACTERS.__serialize_only__ + ["width","height","filename","grid","coords"]
+    __serialize_only__ = Map_CHARACTERS.__serialize_only__ + ["width","height","filename","coords","seed"] # grid is saved by to_dict as "grid_delta" or "grid_compact" 
     def __init__(
             self, 
             filename="default", 
@@ -977,7 +1394,8 @@ class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
             previous_coords = (0,0,0), 
             prev_x = MAP_WIDTH//2, 
             prev_y = MAP_HEIGHT//2, 
-            going_up = False
+            going_up = False, 
+            seed = None
         ):
         # -- 
         Serializable.__init__(self)
@@ -1010,23 +1428,252 @@ class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
         self.starting_x = None
         self.starting_y = None
         self.rooms = None # could be tuple (x,y,w,h) of rectangular room of could be a Room instance 
+        # file of the last save or load, the next saves to it append the changes to its journal ( Save_JSON_Incremental ) 
+        self.saved_file = None 
+        self.journal_bytes = 0 
+        self.save_results = deque() # (filename, b_ok) of the writes finished by SAVE_WRITER, see apply_save_results 
+        # seed of the terrain ( generate_terrain ), random if None, and the generated terrain to find the changed cells 
+        self.seed = seed 
+        self.seed_terrain = None 
         if b_generate: 
             self.generate()
+            self.grid.compact() # plain generated tiles become terrain 
         # else:
             # self.grid_init_uniform()
+    def to_dict(self):
+        data = self.to_dict_fields()
+        T1 = tic()
+        data.update(self.get_grid_data())
+        toc(T1, "Map.get_grid_data() ||")
+        return data 
+    def get_grid_data(self):
+        """ the saved grid : the cells changed since the seeded generation ("grid_delta"), or the whole grid ("grid_compact") for the maps without seed_terrain """
+        if self.seed_terrain is None: return {"grid_compact": self.encode_grid()}
+        return {"grid_delta": self.get_seed_delta()}
+    def get_seed_delta(self):
+        """ [x, y, entry] of the cells which differ from the seeded terrain, entries like get_dirty_tiles ( applied by apply_tile_patches ) """
+        grid, base = self.grid, self.seed_terrain 
+        delta = []
+        for i in [ i for i, (palette_id, base_id) in enumerate(zip(grid.terrain, base)) if palette_id != base_id ]:
+            _, entry = grid.peek(i)
+            if entry is not None and base[i] != TileGrid.EMPTY and entry == grid.palette[base[i]]: continue # materialized, not changed 
+            delta.append([i % self.width, i // self.width, self.get_cell_entry(i)])
+        return delta 
+    def to_dict_fields(self):
+        """ the saved fields without the grid """
+        return super().to_dict()
     def from_dict(self, dictionary):
+        # saves older than the compact format have the "grid" key, which is loaded by Serializable.from_dict 
+        # "grid_delta" is applied over the terrain generated again from the seed 
+        # "grid_patches" are the journal tiles added by Load_JSON 
+        compact = dictionary.get("grid_compact", None)
+        delta = dictionary.get("grid_delta", None)
+        patches = dictionary.get("grid_patches", None)
+        dictionary = { k: v for k, v in dictionary.items() if k not in ("grid_compact", "grid_delta", "grid_patches") }
         if not super().from_dict(dictionary):
             return False
+        self.seed_terrain = None 
+        if compact is not None: self.grid = self.decode_grid(compact)
+        if delta is not None:
+            T1 = tic()
+            self.generate_terrain()
+            if self.seed_terrain is None:
+                print(f"Warning: no terrain generator for {self.filename}, the map is loaded without terrain")
+                self.grid = TileGrid(self.width, self.height)
+            self.apply_tile_patches(delta)
+            toc(T1, "Map.generate_terrain() || seed and delta ||")
+        if patches: self.apply_tile_patches(patches)
+        if not self.is_chunked(): # loaded whole, nothing stays pending 
+            for key in list(self.grid.pending_chunks): self.grid.load_chunk(key)
         # Place characters after loading grid
         T1 = tic()
         for enemy in self.enemies:
             self.place_character(enemy)
-        self.buildings = [ self.grid[y][x] for y in range(self.height) for x in range(self.width) if isinstance(self.grid[y][x], TileBuilding) ]
-        self.spawners = [ self.grid[y][x] for y in range(self.height) for x in range(self.width) if isinstance(self.grid[y][x], Spawner) ]
+        self.update_buildings_list()
+        self.update_spawners_list()
         toc(T1, "Loading Buildings and Spawners ||")
         print("Buildings :", len(self.buildings), "Spawners :", len(self.spawners))
         return True
     # -- 
+    def get_journal_file(self, filename):
+        return str(filename) + MAP_JOURNAL_SUFFIX
+    def set_saved_state(self, filename, journal_bytes = 0):
+        self.saved_file = str(filename)
+        self.journal_bytes = journal_bytes 
+        self.clear_changes()
+    def clear_changes(self):
+        """ the map is saved, the next journal record starts from here """
+        self.grid.dirty_cells.clear()
+        self.dirty_enemies.clear()
+        self.dirty_fields = False 
+    def get_journal_record(self):
+        """ the changes since the last save : "tiles" for the dirty cells, "fields" ( with the whole list of enemies ) if dirty_fields, 
+        otherwise "enemies" [index, dict] for the enemies moved or updated. None if nothing changed. """
+        record = {}
+        if self.dirty_fields:
+            fields = self.to_dict_fields()
+            record["fields"] = fields 
+            record["removed"] = [ k for k in self._serialize_keys if k not in fields ] # fields which are None 
+        elif self.dirty_enemies:
+            dirty = self.dirty_enemies 
+            enemies = [ [i, enemy.to_dict()] for i, enemy in enumerate(self.enemies) if enemy in dirty ]
+            if enemies: record["enemies"] = enemies 
+        if self.grid.dirty_cells: record["tiles"] = self.get_dirty_tiles()
+        return record or None 
+    def get_save_callback(self, filename):
+        """ on_done of SAVE_WRITER, runs on the writer thread so it only queues the result """
+        return lambda b_ok: self.save_results.append((filename, b_ok))
+    def apply_save_results(self):
+        """ a failed write forces a snapshot on the next save : the changes it had are cleared already """
+        while self.save_results:
+            filename, b_ok = self.save_results.popleft()
+            if b_ok or self.saved_file != filename: continue 
+            print(f"Warning: saving {filename} failed, the next save writes a full snapshot")
+            self.saved_file = None 
+    def Save_JSON(self, filename):
+        # a full snapshot, the journal is obsolete 
+        journal = self.get_journal_file(filename)
+        SAVE_WRITER.cancel(journal)
+        SAVE_WRITER.wait_for(journal)
+        if not super().Save_JSON(filename): return False 
+        if os.path.exists(journal): os.remove(journal)
+        self.set_saved_state(filename)
+        return True 
+    def Save_JSON_Async(self, filename, backup = None):
+        return self.Save_JSON_Incremental(filename, b_snapshot = True, backup = backup)
+    def Save_JSON_Incremental(self, filename, b_snapshot = False, backup = None):
+        """ append the changes since the last save or load of filename to its journal (filename + MAP_JOURNAL_SUFFIX) : the cells, fields and enemies 
+        marked by the mutators ( get_journal_record ). A full snapshot replacing the journal is written instead on the first save, when filename changes, 
+        when the journal is over MAP_JOURNAL_MAX_BYTES or after a failed write ( apply_save_results ). Both are written by SAVE_WRITER in background. """
+        filename = str(filename)
+        journal = self.get_journal_file(filename)
+        T1 = tic()
+        self.apply_save_results()
+        if not b_snapshot:
+            b_snapshot = (
+                self.saved_file != filename or self.journal_bytes > MAP_JOURNAL_MAX_BYTES or 
+                not (os.path.exists(filename) or SAVE_WRITER.is_pending(filename))
+            )
+        if b_snapshot:
+            SAVE_WRITER.cancel(journal) # the snapshot has the queued changes 
+            SAVE_WRITER.submit(filename, self.to_dict(), backup = backup, reset = journal, on_done = self.get_save_callback(filename))
+            self.set_saved_state(filename)
+            toc(T1, "Map.Save_JSON_Incremental() || snapshot ||")
+            return True 
+        record = self.get_journal_record()
+        if record:
+            line = json.dumps(record, separators = (",", ":"))
+            SAVE_WRITER.append(journal, line, on_done = self.get_save_callback(filename))
+            self.journal_bytes += len(line) + 1
+        self.clear_changes()
+        toc(T1, "Map.Save_JSON_Incremental() || delta ||")
+        return True 
+    def estimate_bytes(self):
+        """ approximate memory of the map, for the budget of MapCache """
+        return self.width*self.height*MAP_CACHE_TERRAIN_CELL_BYTES + (self.grid.count_materialized() + len(self.grid.pending))*MAP_CACHE_TILE_BYTES + len(self.enemies)*MAP_CACHE_CHARACTER_BYTES
+    def get_summary(self):
+        """ the record of the map in the WorldIndex """
+        stairs, buildings = [], []
+        for x, y, tile in self.grid.materialized(): # terrain cells have no stairs nor buildings 
+            if tile.stair: stairs.append([x, y, list(tile.stair), tile.stair_x, tile.stair_y])
+            if isinstance(tile, TileBuilding): buildings.append([type(tile).__name__, x, y, bool(tile.b_enemy), int(tile.villagers)])
+        for i, tile_dict in self.grid.pending.items(): # unloaded chunks 
+            x, y = i % self.width, i // self.width 
+            stair = self._deserialize(tile_dict.get("stair", None), None)
+            if stair: stairs.append([x, y, list(stair), tile_dict.get("stair_x", None), tile_dict.get("stair_y", None)])
+            if issubclass(self.get_pending_class(tile_dict), TileBuilding): buildings.append([tile_dict["class_name"], x, y, bool(tile_dict.get("b_enemy", False)), int(tile_dict.get("villagers", 0))])
+        return {
+            "enemy_type": self.enemy_type, 
+            "width": self.width, 
+            "height": self.height, 
+            "enemies": len(self.enemies), 
+            "stairs": stairs, 
+            "buildings": buildings
+        }
+    def to_sections(self):
+        """ the saved dict split in the sections of a SaveContainer : "delta" for the seeded maps, 
+        the compact "grid" and its "special" tiles (stairs and buildings) for the others. 
+        "summary" is get_summary(), read alone by the lookups which don't load the map ( Game_DATA.get_map_stairs ) """
+        fields = self.to_dict_fields()
+        sections = {"metadata": fields, "enemies": fields.pop("enemies", []), "summary": self.get_summary()}
+        if self.seed_terrain is not None:
+            sections["delta"] = self.get_seed_delta()
+        else:
+            grid = self.encode_grid()
+            sections["special"] = grid.pop("special")
+            sections["grid"] = grid 
+        return sections 
+    def from_sections(self, sections):
+        data = dict(sections["metadata"])
+        data["enemies"] = sections.get("enemies", [])
+        if "delta" in sections:
+            data["grid_delta"] = sections["delta"]
+        else:
+            data["grid_compact"] = dict(sections["grid"], special = sections.get("special", []))
+        return self.from_dict(data)
+    def Save_Binary(self, filename, b_async = True):
+        """ save as a SaveContainer, written by SAVE_WRITER in background unless b_async is False """
+        filename = str(filename)
+        sections = self.to_sections()
+        self.clear_changes() # the binary saves are whole, the changes are only tracked for the journal 
+        if b_async:
+            SAVE_WRITER.submit_task(filename, lambda: SaveContainer.Write(filename, sections))
+            return True 
+        SAVE_WRITER.cancel(filename)
+        return SaveContainer.Write(filename, sections)
+    def Load_Binary(self, filename):
+        """ load a map saved with Save_Binary, only the sections of the map are decompressed ( not "summary" ) """
+        SAVE_WRITER.wait_for(filename)
+        try:
+            with SaveContainer(filename) as container:
+                names = ["metadata", "enemies"] + (["delta"] if container.has("delta") else ["grid", "special"])
+                return self.from_sections({ name: container.read(name) for name in names if container.has(name) })
+        except FileNotFoundError:
+            print(f"File not found: {filename}")
+        except Exception as e:
+            print(f"Error loading container from {filename}: {e}")
+        return False 
+    @staticmethod
+    def Read_Sections(filename, *names):
+        """ the requested sections of a map saved with Save_Binary, without loading the map ( ex. Map.Read_Sections(file, "metadata") ) """
+        SAVE_WRITER.wait_for(filename)
+        with SaveContainer(filename) as container:
+            return { name: container.read(name) for name in names }
+    def Load_JSON(self, filename):
+        """ load the snapshot and replay the records of its journal """
+        filename = str(filename)
+        journal = self.get_journal_file(filename)
+        SAVE_WRITER.wait_for(filename) # don't read a file with a pending background write 
+        SAVE_WRITER.wait_for(journal)
+        if not os.path.exists(filename):
+            print(f"File not found: {filename}")
+            return False
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            patches, journal_bytes = [], 0
+            if os.path.exists(journal):
+                with open(journal, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            print(f"Warning: truncated record in {journal}, the next records are ignored")
+                            break 
+                        journal_bytes += len(line)
+                        data.update(record.get("fields", {}))
+                        for key in record.get("removed", []): data.pop(key, None)
+                        enemies = data.get("enemies", [])
+                        for i, enemy in record.get("enemies", []): 
+                            if i < len(enemies): enemies[i] = enemy 
+                        patches.extend(record.get("tiles", []))
+            data["grid_patches"] = patches 
+            if not self.from_dict(data): return False 
+        except Exception as e:
+            print(f"Error loading JSON from {filename}: {e}")
+            return False
+        self.set_saved_state(filename, journal_bytes = journal_bytes)
+        return True 
     def generate(self):
         print("Map :", self.filename)
         if self.filename == "procedural_dungeon":
@@ -1055,25 +1702,45 @@ class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
                 except FileNotFoundError:
                     print(f"Map file {self.filename}.txt not found, using default map")
                     self._generate_default()
-    def _generate_default(self):
-        # inner floors, random trees
-        self.enemy_type = "default"
+    def generate_terrain(self):
+        """ the seeded part of the generation : the terrain and rooms of the biome (terrain_<filename>), kept in self.seed_terrain. 
+        The same seed, biome and size give the same grid, a save holds the seed and the cells changed afterwards ( get_seed_delta ). 
+        Returns the cells chosen for the generated items, None if the biome has no terrain generator. """
+        generator = getattr(self, "terrain_" + str(self.filename), None)
+        if generator is None: return None 
+        if self.seed is None: self.seed = random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        self.noise_base = self.seed % 256 # the noise module takes 256 bases 
+        features = generator()
+        self.commit_terrain()
+        self.seed_terrain = array('H', self.grid.terrain)
+        return features 
+    def terrain_default(self):
         self.grid_init_uniform()
         self.add_patches()
         self.add_trees()
         self.add_rocks()
+    def _generate_default(self):
+        # inner floors, random trees
+        self.enemy_type = "default"
+        self.generate_terrain()
         self.add_enemy_mill(quantity=2)
         self.add_enemy_lumber_mill(quantity=2)
-    def generate_procedural_forest(self):
-        self.enemy_type = "deep_forest"
+    def terrain_procedural_forest(self):
         self.grid_init_uniform("grass",True)
         self.grid_init_uniform("tree", False,x1 = 1, x2 = self.width-1, y1 = 1, y2=self.height-1)
         self.add_rooms_with_connectors("grass","dirt")
         self.add_patches(scale = 0.4)
         self.ensure_connection()  # <--- Here!
+    def generate_procedural_forest(self):
+        self.enemy_type = "deep_forest"
+        self.generate_terrain()
         self.add_dungeon_loot(k=10)
         self.add_enemy_lumber_mill(quantity=4)
         self.add_enemy_tower(quantity=2)
+    def terrain_procedural_dungeon(self):
+        self.grid_init_uniform("wall",False)
+        self.add_rooms_with_connectors("floor","dirt")
     def generate_procedural_dungeon(self, previous_map_coords, prev_x, prev_y, up=False):
         """
         Generate a multi-level RogueLike dungeon with rooms, corridors, and a stair_down.
@@ -1093,10 +1760,9 @@ class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
         self.coords = (prev_x_map, prev_y_map, new_z)  # Update map coords, it's necessary? 
         self.enemy_type = "dungeon"
         # initialize grid
-        self.grid_init_uniform("wall",False)
-        self.add_rooms_with_connectors("floor","dirt")
+        self.generate_terrain()
         # Choose starting point (stair_up or stair_down to previous map)
-        start_room = random.choice(self.rooms)
+        start_room = self.rng.choice(self.rooms)
         room_x, room_y, room_w, room_h = start_room
         new_x = room_x + room_w // 2
         new_y = room_y + room_h // 2
@@ -1116,57 +1782,236 @@ class Map(Serializable, Map_SPECIAL, Map_MODELLING, Map_CHARACTERS, Map_TILES):
         self.add_enemy_tower(quantity=2, floor_sprite = "floor")
         self.add_magic_tower(probability = 0.1*dungeon_level, floor_sprite = "floor")
         return new_x, new_y, new_z
-    def generate_procedural_field(self):
-        self.enemy_type = "field"
+    def terrain_procedural_field(self):
+        """ returns the cells of the apples """
         self.grid_init_uniform("grass",True)
         self.add_patches()
         self.add_rocks()
+        buffer = self.get_terrain_buffer()
+        field = Noise_Field(noise.pnoise2, self.width, self.height, 0.1, octaves=1, persistence=0.5, lacunarity=2.0, base=self.noise_base)
+        trees, apples = [], []
         for i in range(self.width-1):
             for j in range(self.height-1):
-                n = noise.pnoise2(i * 0.1, j * 0.1, octaves=1, persistence=0.5, lacunarity=2.0)
-                if n > 0.2:
-                    self.grid[j][i] = Tile(i,j,walkable=False, sprite_key="tree")
-                elif random.random() < 0.01:
-                    if self.is_walkable(i,j): self.grid[j][i].add_item(Food(name ="Apple", nutrition=d(20,60)))
+                if field[j*self.width + i] > 0.2:
+                    trees.append(j*self.width + i)
+                elif self.rng.random() < 0.01:
+                    if buffer.is_walkable(i,j): apples.append((i, j))
+        buffer.stamp(TerrainBuffer.Entry("tree", False), trees)
+        return apples 
+    def generate_procedural_field(self):
+        self.enemy_type = "field"
+        apples = self.generate_terrain()
+        for i, j in apples: self.grid[j][i].add_item(Food(name ="Apple", nutrition=self.rng.uniform(20,60)))
         self.add_enemy_mill(quantity=4)
         self.add_enemy_tower(quantity=2)
-    def generate_procedural_road(self):
-        self.enemy_type = "road"
+    def terrain_procedural_road(self):
+        """ returns the cells of the breads """
         self.grid_init_uniform("grass",True)
         self.add_patches()
         # Vertical road with noise
         road_x = self.width//2
-        for y in range(self.width):
-            offset = int(noise.pnoise1(y * 0.1, octaves=1, persistence=0.5, lacunarity=2.0) * 10)
+        road, breads = [], []
+        for y in range(self.height):
+            offset = int(noise.pnoise1(y * 0.1, octaves=1, persistence=0.5, lacunarity=2.0, base=self.noise_base) * 10)
             road_x += offset
             road_x = max(1, min(self.width-2, road_x))
-            self.grid[y][road_x] = Tile(road_x, y, walkable=True, sprite_key="grass")
-            if random.random() < 0.05:
-                self.grid[y][road_x].add_item(Food(name ="Bread", nutrition=15))
-        for i in range(self.height):
-            for j in range(self.height):
-                if random.random() < 0.1 and abs(j - road_x) > 2:
-                    self.grid[j][i] = Tile(i,j,walkable=False, sprite_key="tree")
+            road.append(y*self.width + road_x)
+            if self.rng.random() < 0.05: breads.append((road_x, y))
+        buffer = self.get_terrain_buffer()
+        buffer.stamp(TerrainBuffer.Entry("grass", True), road)
+        draws = [ self.rng.random() for _ in range(self.width*self.height) ] # (i, j) -> draws[i*self.height + j]
+        buffer.stamp(TerrainBuffer.Entry("tree", False), [ j*self.width + i for i in range(self.width) for j in range(self.height) if draws[i*self.height + j] < 0.1 and abs(j - road_x) > 2 ])
+        return breads 
+    def generate_procedural_road(self):
+        self.enemy_type = "road"
+        breads = self.generate_terrain()
+        for x, y in breads: self.grid[y][x].add_item(Food(name ="Bread", nutrition=15))
         self.add_enemy_mill(quantity=4)
         self.add_enemy_tower(quantity=2)
-    def generate_procedural_lake(self):
-        self.enemy_type = "lake"
+    def terrain_procedural_lake(self):
+        """ returns the cells of the fish and of the whetstones """
         self.grid_init_uniform("grass", True)
         self.add_patches()
         center_x, center_y = self.width//2, self.height//2
+        radius = min(self.width, self.height)*3/7 # 30 on the 70x70 maps 
+        field = Noise_Field(noise.pnoise2, self.width, self.height, 0.05, octaves=1, persistence=0.5, lacunarity=2.0, base=self.noise_base)
+        water, trees, fish, whetstones = [], [], [], []
         for i in range(self.width-1):
             for j in range(self.height-1):
-                n = noise.pnoise2(i * 0.05, j * 0.05, octaves=1, persistence=0.5, lacunarity=2.0)
                 dist = ((i - center_x) ** 2 + (j - center_y) ** 2) ** 0.5
-                if n > -0.1 and dist < 30:
-                    self.grid[j][i] = Tile(i,j,walkable=False, sprite_key="water")
-                elif random.random() < 0.1:
-                    self.grid[j][i] = Tile(i,j,walkable=False, sprite_key="tree")
-                elif random.random() < 0.001:
-                    self.grid[j][i].add_item(Food(name = "Fish", nutrition=80))
-                elif random.random() < 0.0005:
-                    self.grid[j][i].add_item(WeaponRepairTool("Whetstone", uses=10))
+                if field[j*self.width + i] > -0.1 and dist < radius:
+                    water.append(j*self.width + i)
+                elif self.rng.random() < 0.1:
+                    trees.append(j*self.width + i)
+                elif self.rng.random() < 0.001:
+                    fish.append((i, j))
+                elif self.rng.random() < 0.0005:
+                    whetstones.append((i, j))
+        buffer = self.get_terrain_buffer()
+        buffer.stamp(TerrainBuffer.Entry("water", False), water)
+        buffer.stamp(TerrainBuffer.Entry("tree", False), trees)
+        return fish, whetstones 
+    def generate_procedural_lake(self):
+        self.enemy_type = "lake"
+        fish, whetstones = self.generate_terrain()
+        for i, j in fish: self.grid[j][i].add_item(Food(name = "Fish", nutrition=80))
+        for i, j in whetstones: self.grid[j][i].add_item(WeaponRepairTool("Whetstone", uses=10))
         self.add_dungeon_entrance()
         self.add_enemy_tower(quantity=3)
+
+# WorldIndex.update() || {Map.get_summary} || {}
+class WorldIndex: # summaries of the saved maps of a slot 
+    """ One small record per saved map, keyed by coords : biome (enemy_type), size, enemy count, stairs and buildings. 
+    Updated by Game_DATA.save_map, it answers the questions about the maps which aren't loaded without reading their files. """
+    VERSION = 1
+    def __init__(self):
+        self.records = {} # (x,y,z) -> Map.get_summary() 
+    def update(self, coords, summary):
+        self.records[tuple(coords)] = summary 
+    def get(self, coords):
+        return self.records.get(tuple(coords), None)
+    def is_visited(self, coords):
+        return tuple(coords) in self.records
+    def get_stairs(self, coords):
+        """ [x, y, target coords, target x, target y] of the stairs of the map """
+        record = self.get(coords)
+        return record["stairs"] if record else []
+    def find_buildings(self, class_name = None, b_enemy = None, coords = None):
+        """ (coords, [class name, x, y, b_enemy, villagers]) of the indexed buildings matching the filters """
+        for map_coords, record in self.records.items():
+            if coords is not None and map_coords != tuple(coords): continue 
+            for building in record["buildings"]:
+                if class_name is not None and building[0] != class_name: continue 
+                if b_enemy is not None and building[3] != b_enemy: continue 
+                yield map_coords, building 
+    def to_dict(self):
+        return {"version": WorldIndex.VERSION, "maps": [ [list(coords), record] for coords, record in self.records.items() ]}
+    def from_dict(self, dictionary):
+        self.records = { tuple(coords): record for coords, record in dictionary.get("maps", []) }
+        return True 
+    def Save_JSON_Async(self, filename):
+        SAVE_WRITER.submit(filename, self.to_dict())
+        return True 
+    def Load_JSON(self, filename):
+        SAVE_WRITER.wait_for(filename)
+        if not os.path.exists(filename): return False 
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return self.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Error loading JSON from {filename}: {e}")
+            return False 
+
+class MapCache: # LRU of the loaded maps bounded by an entry count and an approximate memory budget 
+    """ Dict-like coords -> Map. When a bound is exceeded the least recently visited maps are handed to on_evict(coords, map) 
+    (which saves them) and dropped, the coords returned by pinned() are never evicted ( the current map and the home map ). """
+    def __init__(self, on_evict = None, pinned = None, max_entries = MAP_CACHE_MAX_ENTRIES, max_bytes = MAP_CACHE_MAX_BYTES):
+        self.on_evict = on_evict 
+        self.pinned = pinned 
+        self.max_entries = max_entries 
+        self.max_bytes = max_bytes 
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # coords -> Map 
+    def __contains__(self, coords):
+        if coords in self._entries:
+            self.hits += 1
+            return True 
+        self.misses += 1
+        return False 
+    def __getitem__(self, coords):
+        self._entries.move_to_end(coords)
+        return self._entries[coords]
+    def get(self, coords, default = None):
+        return self[coords] if coords in self._entries else default 
+    def __setitem__(self, coords, map_obj):
+        self._entries[coords] = map_obj 
+        self._entries.move_to_end(coords)
+        self.trim()
+    def update(self, other):
+        for coords, map_obj in other.items(): self[coords] = map_obj 
+    def pop(self, coords, default = None):
+        return self._entries.pop(coords, default)
+    def keys(self):
+        return self._entries.keys()
+    def items(self):
+        return self._entries.items()
+    def __len__(self):
+        return len(self._entries)
+    def trim(self):
+        """ evict the least recently visited maps which aren't pinned until the bounds are respected """
+        self.bytes = sum( m.estimate_bytes() for m in self._entries.values() if m )
+        if len(self._entries) <= self.max_entries and self.bytes <= self.max_bytes: return 
+        pinned = set(self.pinned()) if self.pinned else set()
+        pinned.add(next(reversed(self._entries))) # the map just added 
+        for coords in list(self._entries.keys()):
+            if len(self._entries) <= self.max_entries and self.bytes <= self.max_bytes: break 
+            if coords in pinned: continue 
+            map_obj = self._entries.pop(coords)
+            if map_obj: 
+                self.bytes -= map_obj.estimate_bytes()
+                if self.on_evict: self.on_evict(coords, map_obj)
+            self.evictions += 1
+    def clear(self):
+        """ drop every map without on_evict """
+        self._entries.clear()
+        self.bytes = 0
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def stats(self):
+        total = self.hits + self.misses 
+        return {
+            "entries": len(self._entries), 
+            "max_entries": self.max_entries, 
+            "bytes": self.bytes, 
+            "max_bytes": self.max_bytes, 
+            "hits": self.hits, 
+            "misses": self.misses, 
+            "evictions": self.evictions, 
+            "hit_ratio": self.hits/total if total else 0.0
+        }
+
+class MapPrefetcher: # staging area of the maps loaded or generated in background 
+    """ request(coords, loader) runs loader() -> (map, b_generated) on a worker thread, 
+    take(coords) returns the staged result (waiting for it if the worker is still busy with it) or None if it wasn't requested. """
+    def __init__(self, workers = MAP_PREFETCH_WORKERS):
+        self.workers = workers 
+        self._pool = None 
+        self._staged = {} # coords -> Future 
+        self.requests = 0
+        self.taken = 0
+        self.discarded = 0
+        self.errors = 0
+    def is_staged(self, coords):
+        return coords in self._staged 
+    def request(self, coords, loader):
+        if coords in self._staged: return False 
+        if self._pool is None: self._pool = ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "MapPrefetch")
+        self._staged[coords] = self._pool.submit(loader)
+        self.requests += 1
+        return True 
+    def take(self, coords):
+        future = self._staged.pop(coords, None)
+        if future is None: return None 
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"MapPrefetcher: error prefetching {coords}: {e}")
+            self.errors += 1
+            return None 
+        self.taken += 1
+        return result 
+    def discard(self, keep = ()):
+        """ drop the staged maps which aren't in keep ( a running load finishes and is ignored ) """
+        for coords in list(self._staged.keys()):
+            if coords in keep: continue 
+            self._staged.pop(coords).cancel()
+            self.discarded += 1
+    def stats(self):
+        return {"staged": len(self._staged), "requests": self.requests, "taken": self.taken, "discarded": self.discarded, "errors": self.errors}
                     
 # --- END
\ No newline at end of file
@@ -10,13 +10,15 @@ from artificial_behavior import *
 import random
 import math
 import os 
+import sys
 from heapq import heappush, heappop
 from itertools import product, count
-from collections import deque
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # third-party 
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap, QPainter, QTransform, QColor
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QTransform, QColor
 from PyQt5.QtWidgets import QGraphicsPixmapItem, QInputDialog
 import noise  # Use python-perlin-noise instead of pynoise
 
@@ -29,13 +31,205 @@ def is_enemy_of(char1, char2):
 
 def manhattan(x1, y1, x2, y2):
     return abs(x1 - x2) + abs(y1 - y2)
+
+def key_uses_sprite(cache_key, sprite_key):
+    """ True if sprite_key is cache_key or is inside it, the render, lod and rotation keys are nested tuples of sprite keys """
+    if cache_key == sprite_key: return True 
+    if isinstance(cache_key, tuple): return any( key_uses_sprite(k, sprite_key) for k in cache_key )
+    return False 
     
+# PixmapCache.get() || { PixmapCache.put() } || {}
+class PixmapCache: # LRU cache of pixmaps bounded by an approximate memory budget 
+    """ Shared cache of composed pixmaps, the least recently used entries are evicted when max_bytes is exceeded. """
+    def __init__(self, max_bytes = TILE_RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes 
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (pixmap, cost)
+    @staticmethod
+    def pixmap_cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    def get(self, key):
+        """ return the cached pixmap or None """
+        entry = self._entries.get(key, None)
+        if entry is None:
+            self.misses += 1
+            return None 
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    def put(self, key, pixmap):
+        old = self._entries.pop(key, None)
+        if old: self.bytes -= old[1]
+        cost = self.pixmap_cost(pixmap)
+        self._entries[key] = (pixmap, cost)
+        self.bytes += cost 
+        self.trim()
+        return pixmap 
+    def trim(self):
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, cost) = self._entries.popitem(last=False)
+            self.bytes -= cost 
+            self.evictions += 1
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes 
+        self.trim()
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+    def discard_if(self, f_filter):
+        """ remove the entries whose key pass f_filter, return how many """
+        keys = [ key for key in self._entries if f_filter(key) ]
+        for key in keys: self.bytes -= self._entries.pop(key)[1]
+        return len(keys)
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def stats(self):
+        total = self.hits + self.misses 
+        return {
+            "entries": len(self._entries), 
+            "bytes": self.bytes, 
+            "max_bytes": self.max_bytes, 
+            "hits": self.hits, 
+            "misses": self.misses, 
+            "evictions": self.evictions, 
+            "hit_ratio": self.hits/total if total else 0.0
+        }
+    def __len__(self):
+        return len(self._entries)
+
+class SpriteRegistry: # lazy dict-like sprite store 
+    """ Sprites are decoded on a worker thread on first access, a shared placeholder is returned while the load is pending. 
+    The least recently used sprites are evicted when max_bytes is exceeded and reloaded on the next access. """
+    def __init__(self, names = (), loader = None, on_load = None, on_evict = None, max_bytes = SPRITE_REGISTRY_MAX_BYTES, blocking = not SPRITE_LAZY_LOADING):
+        self.names = set(names) # every sprite key that can be loaded 
+        self.loader = loader # key -> QImage, runs on the worker threads (no QPixmap there) 
+        self.on_load = on_load # key -> None, called in the gui thread when a sprite is (re)loaded 
+        self.on_evict = on_evict # key -> None
+        self.max_bytes = max_bytes 
+        self.blocking = blocking # load on the calling thread instead of returning the placeholder 
+        self.bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self._sprites = OrderedDict() # key -> (pixmap, cost)
+        self._pending = {} # key -> Future[QImage]
+        self._stale = set() # keys for which the placeholder was handed out 
+        self._pool = None 
+        self._placeholder = None 
+    def get_placeholder(self):
+        if self._placeholder is None:
+            self._placeholder = QPixmap(TILE_SIZE, TILE_SIZE)
+            self._placeholder.fill(Qt.transparent)
+        return self._placeholder 
+    def get_pool(self):
+        if self._pool is None: self._pool = ThreadPoolExecutor(max_workers = SPRITE_DECODE_WORKERS)
+        return self._pool 
+    def is_loaded(self, key):
+        return key in self._sprites 
+    def is_pending(self, key):
+        return key in self._pending 
+    def request(self, key):
+        """ start loading the sprite in background, do nothing if it is loaded or already requested """
+        if key in self._sprites or key in self._pending: return 
+        if self.blocking: 
+            self.load(key)
+        else:
+            self._pending[key] = self.get_pool().submit(self.loader, key)
+    def load(self, key):
+        """ load the sprite on the calling thread and return it """
+        future = self._pending.pop(key, None)
+        image = future.result() if future else self.loader(key)
+        return self._finish(key, image)
+    def preload(self, keys = None):
+        """ load the sprites (every known sprite by default) on the thread pool and wait for them """
+        keys = [ key for key in (self.names if keys is None else keys) if not key in self._sprites ]
+        for key in keys: self.request(key)
+        for key in keys: 
+            if key in self._pending: self.load(key)
+    def poll(self):
+        """ finish the background loads that are done, return the list of loaded keys (gui thread) """
+        done = [ key for key, future in self._pending.items() if future.done() ]
+        for key in done: self._finish(key, self._pending.pop(key).result())
+        return done 
+    def _finish(self, key, image):
+        if image is None or image.isNull(): print(f"Failed to load sprite {key}")
+        pixmap = QPixmap() if image is None else QPixmap.fromImage(image)
+        self._store(key, pixmap)
+        self.loads += 1
+        if key in self._stale:
+            self._stale.discard(key)
+            if self.on_load: self.on_load(key)
+        return pixmap 
+    def _store(self, key, pixmap):
+        old = self._sprites.pop(key, None)
+        if old: self.bytes -= old[1]
+        cost = PixmapCache.pixmap_cost(pixmap)
+        self._sprites[key] = (pixmap, cost)
+        self.bytes += cost 
+        self.trim()
+    def trim(self):
+        while self.max_bytes and self.bytes > self.max_bytes and len(self._sprites) > 1:
+            key, (_, cost) = self._sprites.popitem(last=False)
+            self.bytes -= cost 
+            self.evictions += 1
+            if self.on_evict: self.on_evict(key)
+    def get(self, key, default = None):
+        """ return the sprite, the placeholder if it is still loading or default for unknown keys """
+        entry = self._sprites.get(key, None)
+        if entry: 
+            self._sprites.move_to_end(key)
+            return entry[0]
+        if not key in self.names: return default 
+        future = self._pending.get(key, None)
+        if future and future.done(): return self.load(key)
+        self.request(key)
+        entry = self._sprites.get(key, None)
+        if entry: return entry[0]
+        self._stale.add(key)
+        return self.get_placeholder()
+    def __getitem__(self, key):
+        if not key in self: raise KeyError(key)
+        return self.get(key)
+    def __setitem__(self, key, pixmap):
+        self.names.add(key)
+        self._pending.pop(key, None)
+        self._store(key, pixmap)
+    def __contains__(self, key):
+        return key in self.names or key in self._sprites 
+    def __len__(self):
+        return len(self.names)
+    def keys(self):
+        return list(self.names)
+    def items(self):
+        """ loaded sprites only """
+        return [ (key, entry[0]) for key, entry in self._sprites.items() ]
+    def clear(self):
+        self._sprites.clear()
+        self._pending.clear()
+        self._stale.clear()
+        self.bytes = 0
+    def stats(self):
+        return {
+            "known": len(self.names), 
+            "loaded": len(self._sprites), 
+            "pending": len(self._pending), 
+            "bytes": self.bytes, 
+            "max_bytes": self.max_bytes, 
+            "loads": self.loads, 
+            "evictions": self.evictions
+        }
+
 # SANITY COMMENTS
 # 1. Entity.get_tile don't means that the Entity is properly placed at 
 
-# Entity.paint_to() || { Entity.get_sprite() } || {}
+# Entity.paint_to() || { Entity.get_sprite() } || { Tile.get_rotated_sprite() }
 class Entity: # Interface : distance and painting on tile 
     """ Has a paint_to method which is used by the Tile.draw to paint the entity over the tile sprite. """
+    __slots__ = () # the fields are slots of Item, the characters keep a __dict__ 
     __serialize_only__ = ["sprite", "x", "y"] # not a serializable yet 
     def __init__(self):
         self.sprite = None
@@ -53,16 +247,15 @@ class Entity: # Interface : distance and painting on tile
             print(f"Warning: {self} sprite not found")
             return self.get_transparent_image()
         try:
-            if rotation == 0:
-                return Tile.SPRITES[self.sprite]
-            else:                
-                transform = QTransform().rotate(-rotation)
-                return Tile.SPRITES[self.sprite].transformed( transform , mode = 1 )
+            return Tile.get_rotated_sprite(self.sprite, rotation)
         except KeyError:
             print(f"Warning: {self} sprite not found")
             return self.get_transparent_image()
     def paint_to(self, painter, game_instance = None):
         painter.drawPixmap(0, 0, self.get_sprite())
+    def get_paint_signature(self, game_instance = None):
+        """ hashable value that changes whenever paint_to would paint something different, used by the tile render cache """
+        return self.sprite 
     def distance(self, entity):
         return abs(entity.x - self.x) + abs(entity.y - self.y)
     def get_tile(self, map):
@@ -76,6 +269,7 @@ class Entity: # Interface : distance and painting on tile
 # Resource.store() || { Resource.get_value() | Resource.update_value() } || {}
 class Resource: # Interface : store in buildings
     """ Interface for items that can be stored on buildings as a resources. """
+    __slots__ = () # "value" and "type" are slots of the derived items, a second base with slots would be a layout conflict 
     __serialize_only__ = ["value", "type"] # this class isn't Serializable, but the derived classes would be 
     def __init__(self):
         self.value = 0
@@ -100,6 +294,7 @@ class Resource: # Interface : store in buildings
 # SpecialSkillWeapon.use_special_F() || { SpecialSkillWeapon.use_knight_special() | SpecialSkillWeapon.use_tower_special() } || { SpecialSkillWeapon.special_attack(), Character.get_forward_direction() }
 # SpecialSkillWeapon.use_special_End() || { SpecialSkillWeapon.use_thrust_special() } || { Character.get_forward_direction() } 
 class SpecialSkillWeapon: # Interface : use special skills 
+    __slots__ = () 
     def __init__(self):
         pass 
     def consumption(self, char, type): 
@@ -255,6 +450,7 @@ class SpecialSkillWeapon: # Interface : use special skills
 
 # (name, utility, info) ~ (alfa, beta, gama)
 class Item(Serializable, Entity): # Primitive
+    __slots__ = ("sprite", "x", "y", "current_tile", "_transparent_image", "name", "description", "weight") # with Entity 
     __serialize_only__ = Entity.__serialize_only__ + ["name","description","weight"]
     def __init__(self, name="", description="", weight=1, sprite="item"):
         Serializable.__init__(self)
@@ -280,6 +476,7 @@ class Item(Serializable, Entity): # Primitive
     
 # Usable.use() || { Character.remove_item() } || {}
 class Usable(Item): # Interface : use item
+    __slots__ = ("uses",)
     __serialize_only__ = Item.__serialize_only__+["uses"]
     def __init__(self, name="", description="", weight=1, sprite="item", uses = 1):
         if not description: description = "usable item"
@@ -305,6 +502,7 @@ class Usable(Item): # Interface : use item
         # pass 
 
 class Ammo(Usable):
+    __slots__ = ()
     __serialize_only__ = Usable.__serialize_only__
     def __init__(self, name="bolt", description="", weight=1, uses = 100):
         if not description: description = "Ammo for Crossbows. Use it to reload."
@@ -319,6 +517,7 @@ class Ammo(Usable):
         primary.ammo += d_ammo
 
 class Container(Serializable): # Primitive 
+    __slots__ = ("items", "current_char") # Tile keeps the slots, the characters add a __dict__ (Damageable and BehaviourCharacter have no __slots__) 
     __serialize_only__ = ["items"]
     def __init__(self, current_char = None):
         Serializable.__init__(self)
@@ -329,19 +528,25 @@ class Container(Serializable): # Primitive
             if item is i:
                 return index
         return -1
+    def mark_changed(self):
+        """ called by the methods which change the saved items, Tile.mark_changed records the cell for the next map save """
+        pass 
     def add_item(self, item):
         if isinstance(item, Item):
             index = self.get_item_index(item)
-            if index == -1: self.items.append(item)
+            if index == -1: 
+                self.items.append(item)
+                self.mark_changed()
             return True # either the item is already there or add the item 
         return False
     def remove_item(self, item):
         if item in self.items:
             self.items.remove(item)
+            self.mark_changed()
             return True
         return False
-    def add_item_by_chance(self, item_name, chance = 0.1, *args, **kwargs):
-        coin = random.random()
+    def add_item_by_chance(self, item_name, chance = 0.1, *args, rng = None, **kwargs):
+        coin = (rng or random).random() # rng : random.Random of a map generated on the prefetch worker ( Map.add_dungeon_loot ) 
         if coin < chance:
             item_class = globals()[item_name]
             item_instance = item_class(*args, **kwargs)
@@ -357,8 +562,10 @@ class Container(Serializable): # Primitive
     def give_all(self, another):
         if not isinstance(another, Container): return False
         another.items += self.items 
+        another.mark_changed()
         
 class Durable(Item): # interface : has durability_factor, quality
+    __slots__ = ("durability_factor",)
     __serialize_only__ = Item.__serialize_only__ + ["durability_factor"]
     def __init__(self, name="", description="", weight=1, durability_factor=0.995):
         Item.__init__(self, name = name, description = description, weight = weight, sprite=name.lower() )
@@ -390,6 +597,7 @@ class Durable(Item): # interface : has durability_factor, quality
         
 # Equippable.get_equipped_slot() || { Character.getattr() } || {}
 class Equippable(Durable): # Interface : equipment
+    __slots__ = ("slot",)
     __serialize_only__ = Durable.__serialize_only__+["slot"]
     def __init__(self, name="", description="", weight=1, slot="primary_hand", durability_factor=0.995):
         if not description: description = "equippable item"
@@ -415,6 +623,7 @@ class Equippable(Durable): # Interface : equipment
 # Weapon.durability_consumption() || { Character.set_equipment_by_slot() } || {}
 # Weapon.stats_update() || { Weapon.stamina_consumption() | Weapon.durability_consumption() } || { Character.set_equipment_by_slot() }
 class Weapon(Equippable): 
+    __slots__ = ("damage", "stamina_consumption", "max_damage")
     __serialize_only__ = Equippable.__serialize_only__+["damage","stamina_consumption","max_damage"]
     def __init__(self, name="", damage=0 ,description="", weight=1, stamina_consumption=1, durability_factor=0.995):
         if not description: description = "equippable item"
@@ -437,6 +646,7 @@ class Weapon(Equippable):
         return f"{self.damage:.1f} [dmg] "+Durable.get_utility_info(self)
 
 class Fireweapon(Weapon, SpecialSkillWeapon): # interface class 
+    __slots__ = ("ammo", "range", "projectile_sprite", "ammo_type")
     __serialize_only__ = Weapon.__serialize_only__ + ["ammo", "range", "projectile_sprite","ammo_type"]
     def __init__(self, 
             name="Crossbow", 
@@ -515,6 +725,7 @@ class Fireweapon(Weapon, SpecialSkillWeapon): # interface class
 
 class Parriable(Weapon): 
     """ Weapons that has probability to exchange hp damage for stamina consumption. """
+    __slots__ = ()
     __serialize_only__ = Weapon.__serialize_only__
     def __init__(self, name="", damage=0 ,description="", weight=1, stamina_consumption=1, durability_factor=0.995):
         Weapon.__init__(self, name = name, damage = damage, description = description, weight= weight, stamina_consumption = stamina_consumption, durability_factor = durability_factor)
@@ -528,6 +739,7 @@ class Parriable(Weapon):
      
 # Sword.get_parry_chance() || { Parriable.get_parry_chance() } || {}
 class Sword(Parriable, SpecialSkillWeapon):
+    __slots__ = ("days_to_unlock_special",)
     __serialize_only__ = Parriable.__serialize_only__ 
     def __init__(self, name="long_sword", damage=8 ,description="", weight=1, stamina_consumption=1, durability_factor=0.995):
         Parriable.__init__(self, name = name, damage = damage, description = description, weight = weight, stamina_consumption = stamina_consumption, durability_factor = durability_factor)
@@ -545,6 +757,7 @@ class Sword(Parriable, SpecialSkillWeapon):
 
 # Mace.get_parry_chance() || { Parriable.get_parry_chance() } || {}
 class Mace(Parriable, SpecialSkillWeapon):
+    __slots__ = ("days_to_unlock_special",)
     __serialize_only__ = Parriable.__serialize_only__ 
     def __init__(self, name="mace", damage=10 ,description="", weight=1, stamina_consumption=2, durability_factor=0.995):
         Parriable.__init__(self, name = name, damage = damage, description = description, weight = weight, stamina_consumption = stamina_consumption, durability_factor = durability_factor)
@@ -562,6 +775,7 @@ class Mace(Parriable, SpecialSkillWeapon):
 
 # Food.use() || { Food.update_value() | Usable.use() } || { Character.remove_item() }    
 class Food(Usable, Resource):
+    __slots__ = ("value", "type", "nutrition")
     __serialize_only__ = Usable.__serialize_only__+Resource.__serialize_only__+["nutrition"]
     def __init__(self, nutrition=0, name="Meat", description="", weight=1):
         food_uses = 1
@@ -587,6 +801,7 @@ class Food(Usable, Resource):
         return f"{self.nutrition:.1f} [ntr] "+Usable.get_utility_info(self)+f" {self.nutrition*self.uses:.1f} [value]"
 
 class Wood(Item, Resource):
+    __slots__ = ("value", "type")
     __serialize_only__ = Item.__serialize_only__+Resource.__serialize_only__
     def __init__(self, value = 100):
         Item.__init__(self, name="Wood", description="", weight=1, sprite="wood")
@@ -598,6 +813,7 @@ class Wood(Item, Resource):
         return Resource.get_utility_info(self)
 
 class Stone(Item, Resource):
+    __slots__ = ("value", "type")
     __serialize_only__ = Item.__serialize_only__+Resource.__serialize_only__
     def __init__(self, value = 100):
         Item.__init__(self, name="Stone", description="", weight=1, sprite="stone")        
@@ -609,6 +825,7 @@ class Stone(Item, Resource):
         return Resource.get_utility_info(self)
         
 class Metal(Item, Resource):
+    __slots__ = ("value", "type")
     __serialize_only__ = Item.__serialize_only__+Resource.__serialize_only__
     def __init__(self, value = 100):
         Item.__init__(self, name="Metal", description="", weight=1, sprite="metal")
@@ -621,6 +838,7 @@ class Metal(Item, Resource):
         
 # WeaponRepairTool.use() || { Usable.use() } || { Character.remove_item() }
 class WeaponRepairTool(Usable):
+    __slots__ = ("repairing_factor",)
     __serialize_only__ = Usable.__serialize_only__+["repairing_factor"]
     def __init__(self, name="", repairing_factor=1.05, description="", weight=1, uses = 10):
         Usable.__init__(self, name = name, description = description, weight = weight, sprite=name.lower(), uses = uses)
@@ -642,6 +860,7 @@ class WeaponRepairTool(Usable):
         return False
     
 class Armor(Equippable): 
+    __slots__ = ("defense_factor",)
     __serialize_only__ = Equippable.__serialize_only__+["defense_factor"]
     def __init__(self, name="", defense_factor=0.02, description="", weight=1, slot="torso"):
         Equippable.__init__(self, name = name, description = description, weight = weight, slot = slot)
@@ -1135,6 +1354,10 @@ class Player(SkilledCharacter, RegenerativeCharacter): # player or playable npc
         Entity.paint_to(self, painter)
         if game_instance and not (self is game_instance.player):
             self.paint_hp_hud_to(painter)
+    def get_paint_signature(self, game_instance = None):
+        if game_instance and not (self is game_instance.player):
+            return (self.sprite, int(self.hp/self.max_hp*TILE_SIZE)) # hp bar width in pixels 
+        return self.sprite 
 
 class Healer(Player):
     __serialize_only__ = Player.__serialize_only__
@@ -1452,14 +1675,23 @@ class Bear(Enemy):
             if self.current_map != game_instance.current_map: return False
         return AB_behavior_grudge(char=self, game_instance=game_instance)
         
-# Tile.draw() || { Tile.get_default_pixmap() | Entity.paint_to() } || { Entity.get_sprite() }
+# Tile.draw() || { Tile.render() } || { Tile.compose(), Tile.get_render_key() }
+# Tile.render() || { Tile.get_render_key() | PixmapCache.get() | Tile.compose() | PixmapCache.put() } || { Entity.get_paint_signature() }
+# Tile.compose() || { Tile.get_default_pixmap() | Entity.paint_to() } || { Entity.get_sprite() }
 class Tile(Container):
-    SPRITES = {}  # Class-level sprite cache
+    SPRITES = SpriteRegistry(SPRITE_NAMES, loader = lambda key: Tile._decode_sprite(key), on_load = lambda key: Tile._on_sprite_loaded(key), on_evict = lambda key: Tile._forget_rotations(key)) # Class-level lazy sprite cache 
+    RENDER_CACHE = PixmapCache(TILE_RENDER_CACHE_MAX_BYTES) # composed tiles shared between every tile with the same render key 
+    ROTATED_SPRITES = {} # (key, rotation) -> sprite rotated by a cardinal angle (90, 180, 270), filled on demand 
+    ROTATED_SPRITES_LRU = PixmapCache(ROTATED_SPRITE_CACHE_MAX_BYTES) # (key, rotation) -> sprite rotated by any other angle 
+    LOD_SPRITES = {} # (key, size) -> sprite thumbnail of the zoomed out view 
+    LOD_COLORS = {} # lod key -> ARGB32 pixel bytes of the zoomed out view at small tile sizes 
+    LOD_ROW_CACHE = PixmapCache(LOD_ROW_CACHE_MAX_BYTES) # (lod keys of a row, size) -> row pixmap of the zoomed out view 
+    ASSET_PATHS = None # sprite key -> asset file, built by _get_asset_path on first use 
     list_sprites_names = list(SPRITE_NAMES)
+    __slots__ = ("walkable", "blocks_sight", "x", "y", "default_sprite_key", "cosmetic_layer_sprite_keys", "combined_sprite", "stamina_consumption", "stair", "stair_x", "stair_y", "owner") # no __dict__, the subclasses (ActionTile) have one 
     __serialize_only__ = Container.__serialize_only__ + ["x", "y", "walkable", "blocks_sight", "default_sprite_key", "stair", "stair_x", "stair_y", "cosmetic_layer_sprite_keys", "stamina_consumption"]
     def __init__(self, x = 0, y = 0, walkable=True, sprite_key="grass"):
         Container.__init__(self)
-        self._load_sprites()
         self.walkable = walkable
         self.blocks_sight = not walkable
         self.x = x 
@@ -1475,8 +1707,42 @@ class Tile(Container):
         self.stair = None # used to store a tuple map coord to connect between maps 
         self.stair_x = None # points to the stair tile from the map with coord self.stair
         self.stair_y = None # points to the stair tile from the map with coord self.stair 
+        self.owner = None # TileGrid holding the tile, set by the grid ( mark_changed ) 
+    def mark_changed(self):
+        """ the saved form of the tile changed : its cell is written by the next incremental save of the map ( TileGrid.dirty_cells ) """
+        owner = self.owner 
+        if owner is not None: owner.dirty_cells.add(self.y*owner.width + self.x)
     def add_layer(self, sprite_key):
         self.cosmetic_layer_sprite_keys.append( sprite_key )
+        self.mark_changed()
+    def __restore__(self):
+        """ fields of a Tile allocated by Serializable.allocate(), the saved fields are set afterwards by from_dict """
+        self.items = []
+        self.current_char = None 
+        self.walkable = True 
+        self.blocks_sight = False 
+        self.x = 0
+        self.y = 0
+        self.default_sprite_key = "grass"
+        self.cosmetic_layer_sprite_keys = []
+        self.combined_sprite = None 
+        self.stamina_consumption = 4.0 
+        self.stair = None 
+        self.stair_x = None 
+        self.stair_y = None 
+        self.owner = None 
+    def get_palette_entry(self):
+        """ return the signature shared by plain tiles in the compact map format (Map_TILES.encode_grid) or None if the tile must be saved in full """
+        if type(self) is not Tile or self.items or self.stair is not None or self.stair_x is not None: return None 
+        return (self.walkable, self.blocks_sight, self.default_sprite_key, tuple(self.cosmetic_layer_sprite_keys), self.stamina_consumption)
+    @classmethod
+    def from_palette_entry(cls, x, y, entry):
+        """ inverse of get_palette_entry """
+        tile = cls.allocate()
+        tile.x, tile.y = x, y
+        tile.walkable, tile.blocks_sight, tile.default_sprite_key, layers, tile.stamina_consumption = entry
+        tile.cosmetic_layer_sprite_keys = list(layers)
+        return tile 
     def get_transparent_image(self):
         # todo 
         return 
@@ -1486,6 +1752,34 @@ class Tile(Container):
         if len(self.items) > 1:
             painter.drawPixmap(0, 0, Tile.SPRITES.get("sack", self.get_default_pixmap() ))
     def draw(self, scene, x, y, tile_size = TILE_SIZE, extra_pixmap = None, game_instance = None):
+        self.render(tile_size = tile_size, extra_pixmap = extra_pixmap, game_instance = game_instance)
+        # -- Add to Scene
+        item = QGraphicsPixmapItem(self.combined_sprite)
+        item.setPos(x, y)
+        scene.addItem(item)
+    def get_render_key(self, tile_size = TILE_SIZE, extra_key = None, game_instance = None):
+        """ (default sprite, cosmetic layers, item stack, character, extra sprite, tile size) """
+        items = self.items 
+        if not items:
+            items_key = None 
+        elif len(items) == 1:
+            items_key = items[0].get_paint_signature()
+        else:
+            items_key = "sack"
+        char = self.current_char 
+        char_key = char.get_paint_signature(game_instance) if char else None 
+        return (self.default_sprite_key, tuple(self.cosmetic_layer_sprite_keys), items_key, char_key, extra_key, tile_size)
+    def render(self, tile_size = TILE_SIZE, extra_pixmap = None, game_instance = None, extra_key = None):
+        """ return the composed pixmap of the tile (base, layers, items, character and extra pixmap), extra_key identifies the extra pixmap on the render cache """
+        if extra_pixmap is not None and extra_key is None: extra_key = extra_pixmap.cacheKey()
+        key = self.get_render_key(tile_size = tile_size, extra_key = extra_key, game_instance = game_instance)
+        combined = Tile.RENDER_CACHE.get(key)
+        if combined is None:
+            combined = Tile.RENDER_CACHE.put(key, self.compose(tile_size = tile_size, extra_pixmap = extra_pixmap, game_instance = game_instance))
+        self.combined_sprite = combined
+        return combined 
+    def compose(self, tile_size = TILE_SIZE, extra_pixmap = None, game_instance = None):
+        """ paint every layer of the tile into a new pixmap """
         # BEGIN Painter
         combined = QPixmap(tile_size, tile_size) # will be changed with QPainter 
         combined.fill(Qt.transparent)
@@ -1503,11 +1797,56 @@ class Tile(Container):
             painter.drawPixmap(0, 0, extra_pixmap )
         # END Painter 
         painter.end()
-        self.combined_sprite = combined
-        # -- Add to Scene
-        item = QGraphicsPixmapItem(self.combined_sprite)
-        item.setPos(x, y)
-        scene.addItem(item)
+        return combined 
+    def get_lod_key(self):
+        """ return what the zoomed out view shows of the tile : terrain, top cosmetic layer and character sprites """
+        return (
+            self.default_sprite_key, 
+            self.cosmetic_layer_sprite_keys[-1] if self.cosmetic_layer_sprite_keys else None, 
+            self.current_char.sprite if self.current_char else None
+        )
+    @classmethod
+    def get_lod_sprite(cls, key, size):
+        sprite = cls.LOD_SPRITES.get((key, size), None)
+        if sprite is None:
+            sprite = cls.SPRITES.get(key, QPixmap()).scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            cls.LOD_SPRITES[(key, size)] = sprite
+        return sprite 
+    @classmethod
+    def get_lod_color(cls, lod_key):
+        """ return the ARGB32 pixel (4 bytes) with the mean color of the top sprite of the lod key, None is transparent """
+        color = cls.LOD_COLORS.get(lod_key, None)
+        if color is None:
+            top = next( (key for key in reversed(lod_key) if key), None ) if lod_key else None
+            if top is None: 
+                color = bytes(4)
+            else:
+                image = cls.SPRITES.get(top, QPixmap()).toImage()
+                rgb = image.scaled(1, 1, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).pixel(0, 0) if not image.isNull() else 0
+                color = (rgb | 0xFF000000).to_bytes(4, sys.byteorder)
+            cls.LOD_COLORS[lod_key] = color
+        return color 
+    @classmethod
+    def render_lod_row(cls, keys, size):
+        """ return a pixmap with a row of lod keys (None is left transparent), cached by keys and size. 
+        Thumbnails are painted above LOD_COLOR_MAX_TILE_SIZE, below it the row is one color per tile stretched to size. """
+        row = cls.LOD_ROW_CACHE.get((keys, size))
+        if row is None:
+            if size <= LOD_COLOR_MAX_TILE_SIZE:
+                pixels = b"".join( cls.get_lod_color(lod_key) for lod_key in keys )
+                image = QImage(pixels, len(keys), 1, len(keys) * 4, QImage.Format_ARGB32)
+                row = QPixmap.fromImage(image.scaled(len(keys) * size, size))
+            else:
+                row = QPixmap(len(keys) * size, size)
+                row.fill(Qt.transparent)
+                painter = QPainter(row)
+                for i, lod_key in enumerate(keys):
+                    if lod_key is None: continue 
+                    for sprite_key in lod_key:
+                        if sprite_key: painter.drawPixmap(i * size, 0, cls.get_lod_sprite(sprite_key, size))
+                painter.end()
+            cls.LOD_ROW_CACHE.put((keys, size), row)
+        return row 
     def can_place_character(self):
         return self.walkable and (not self.current_char )
     def get_default_pixmap(self):
@@ -1515,6 +1854,7 @@ class Tile(Container):
     def add_cosmetic_sprite(self, sprite_key = None):
         if not sprite_key: return 
         self.cosmetic_layer_sprite_keys.append(sprite_key)
+        self.mark_changed()
     def get_stamina_consumption(self):
         return self.stamina_consumption
     def get_layer_index(self, sprite_name):
@@ -1535,10 +1875,12 @@ class Tile(Container):
     def remove_layer(self, sprite_name = None):
         if not sprite_name: 
             self.cosmetic_layer_sprite_keys.clear() 
+            self.mark_changed()
             return 
         idx = self.get_layer_index(sprite_name)
         if idx is None: return 
         self.cosmetic_layer_sprite_keys.pop(idx)
+        self.mark_changed()
     def is_grass(self):
         if self.default_sprite_key == "grass": return True 
         idx = self.get_layer_index("grass")
@@ -1564,8 +1906,19 @@ class Tile(Container):
     
     @classmethod    
     def get_rotated_sprite(cls, key, rotation = 0):
-        transform = QTransform().rotate(-rotation)
-        return cls.SPRITES[key].transformed( transform , mode = 1 )
+        """ return the sprite rotated counter-clockwise by rotation degrees, raise KeyError if the sprite don't exist """
+        rotation = rotation % 360
+        if rotation == 0: return cls.SPRITES[key]
+        if rotation in (90, 180, 270):
+            sprite = cls.ROTATED_SPRITES.get((key, rotation), None)
+            if sprite is None:
+                sprite = cls._rotate_sprite(key, rotation)
+                cls.ROTATED_SPRITES[(key, rotation)] = sprite 
+            return sprite 
+        sprite = cls.ROTATED_SPRITES_LRU.get((key, rotation))
+        if sprite is None:
+            sprite = cls.ROTATED_SPRITES_LRU.put((key, rotation), cls._rotate_sprite(key, rotation))
+        return sprite 
     
     @classmethod    
     def get_random_sprite(cls, key_filter=""):
@@ -1573,20 +1926,84 @@ class Tile(Container):
         if cdts: return random.choice(cdts)
         return None
 
+    @classmethod
+    def _rotate_sprite(cls, key, rotation):
+        transform = QTransform().rotate(-rotation)
+        return cls.SPRITES[key].transformed( transform , mode = Qt.SmoothTransformation )
+    
+    @classmethod
+    def _forget_rotations(cls, key):
+        for rotation in (90, 180, 270): cls.ROTATED_SPRITES.pop((key, rotation), None)
+    
+    @classmethod
+    def _get_asset_path(cls, key):
+        """ return the path of the asset file for the sprite key or None, extensions are compared case-insensitively like Get_Sprite_Names_From """
+        if cls.ASSET_PATHS is None:
+            extensions = (".png", ".webp", ".jpg", ".jpeg") # by preference when a key has several files 
+            found = {}
+            for file in os.listdir(ASSETS_FOLDER):
+                name, ext = os.path.splitext(file)
+                ext = ext.lower()
+                if ext not in extensions: continue 
+                path = os.path.join(ASSETS_FOLDER, file)
+                if not os.path.isfile(path): continue 
+                if name not in found or extensions.index(ext) < found[name][0]: found[name] = (extensions.index(ext), path)
+            cls.ASSET_PATHS = { name: path for name, (_, path) in found.items() }
+        return cls.ASSET_PATHS.get(key, None)
+    
+    @staticmethod
+    def _get_cache_path(key, size = TILE_SIZE):
+        return os.path.join(SPRITE_CACHE_FOLDER, str(size), key + ".png")
+    
+    @classmethod
+    def _decode_sprite(cls, key, size = TILE_SIZE):
+        """ return the QImage of the sprite scaled to size, from the disk cache when it is newer than the asset (thread safe, no QPixmap) """
+        asset_path = cls._get_asset_path(key)
+        if asset_path is None: return QImage()
+        cache_path = cls._get_cache_path(key, size)
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(asset_path):
+                image = QImage(cache_path)
+                if not image.isNull(): return image
+        except OSError:
+            pass 
+        image = QImage(asset_path)
+        if image.isNull(): return image 
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        try: 
+            os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+            image.save(cache_path, "PNG")
+        except OSError as e:
+            print(f"Failed to cache sprite {key}: {e}")
+        return image 
+    
     @classmethod
     def _try_load(cls, key, size = TILE_SIZE):
         # cls.SPRITES will store the sprites in memory 
+        cls._on_sprite_loaded(key)
         try: 
-            qpx = QPixmap("./assets/"+key)
             print(f"Loading Sprite {key}")
-            cls.SPRITES[key] = qpx.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            cls.SPRITES[key] = QPixmap.fromImage(cls._decode_sprite(key, size))
         except Exception as e:
             print(f"Failed to load sprites: {e}, key {key}")
             cls.SPRITES[key] = QPixmap()
     
     @classmethod
-    def _load_sprites(cls):
-        if not cls.SPRITES:
-            for key in cls.list_sprites_names: cls._try_load(key)
+    def _on_sprite_loaded(cls, key):
+        """ the pixmaps composed or rotated with the previous pixmap (placeholder) of the sprite are stale, the other entries are kept """
+        f_filter = lambda cache_key: key_uses_sprite(cache_key, key)
+        cls._forget_rotations(key)
+        cls.ROTATED_SPRITES_LRU.discard_if(f_filter)
+        cls.RENDER_CACHE.discard_if(f_filter)
+        for cache in (cls.LOD_SPRITES, cls.LOD_COLORS):
+            for cache_key in [ cache_key for cache_key in cache if f_filter(cache_key) ]: del cache[cache_key]
+        cls.LOD_ROW_CACHE.discard_if(f_filter)
+    
+    @classmethod
+    def _load_sprites(cls, keys = None):
+        """ preload the sprites (every sprite by default) on the thread pool, sprites not preloaded are loaded on first access """
+        t0 = tic()
+        cls.SPRITES.preload(keys)
+        toc(t0, f"Tile._load_sprites() || {len(cls.SPRITES.items())} sprites")
 
 # --- END 
\ No newline at end of file
@@ -7,15 +7,55 @@ from performance import *
 from pathlib import Path
 import tempfile, shutil, os, json
 import threading
-from collections import defaultdict
+import sqlite3, zlib, struct, mmap
+from collections import defaultdict, OrderedDict
 
-# Serializable.to_dict() || {._serialize} || {}
-# Serializable.from_dict() || {._deserialize} || {}
-# Serializable.Save_JSON() || {.to_dict} || {}
+# Serializable.__init_subclass__() || {_Build_Fast_Codecs} || {}
+# Serializable.to_dict() || {._fast_to_dict | ._serialize} || {}
+# Serializable.from_dict() || {._fast_from_dict | ._deserialize} || {}
+# Serializable.Save_JSON() || {SaveWriter.cancel | .to_dict | ._write_json} || {}
+# Serializable.Save_JSON_Async() || {.to_dict | SaveWriter.submit} || {}
 # Serializable.Load_JSON() || {.from_dict} || {}
 # Serializable._serialize() || {.to_dict} || {}
-# Serializable._deserialize() || {._get_class_by_name, .from_dict} || {}
+# Serializable._deserialize() || {._get_class_by_name, .restore} || {}
+# Serializable.restore() || {.allocate, .from_dict} || {.__restore__}
 # Serializable._get_class_by_name() 
+# SaveContainer.Write() || {zlib.compress} || {}
+# SaveContainer.read() || {mmap, zlib.decompress} || {}
+# SlotStore.commit() || {SaveWriter.submit_task} || {SlotStore._write_pending}
+SCALAR_TYPES = frozenset((str, int, float, bool)) # saved and loaded as they are, without the _serialize/_deserialize dispatch 
+_MISSING = object()
+
+def _Build_Fast_Codecs(cls):
+    """ return (to_dict, from_dict) functions generated for the declared fields of cls, (None, None) if cls has no usable __serialize_only__ """
+    fields = list(dict.fromkeys(getattr(cls, "__serialize_only__", None) or []))
+    if not fields or not all(f.isidentifier() and f != "class_name" for f in fields): return None, None
+    encoder = [ "def _fast_to_dict(self):", "    data = {'class_name': self.class_name}" ]
+    for f in fields:
+        encoder += [
+            f"    value = getattr(self, '{f}', None)",
+            f"    if value is not None:",
+            f"        if type(value) in SCALAR_TYPES: data['{f}'] = value",
+            f"        elif isinstance(value, Serializable): data['{f}'] = value.to_dict()",
+            f"        else: data['{f}'] = self._serialize(value)"
+        ]
+    encoder.append("    return data")
+    decoder = [ "def _fast_from_dict(self, dictionary):", "    get = dictionary.get" ]
+    for f in fields:
+        decoder += [
+            f"    value = get('{f}', _MISSING)",
+            f"    if value is not _MISSING:",
+            f"        if type(value) in SCALAR_TYPES or value is None: self.{f} = value",
+            f"        else: self.{f} = self._deserialize(value, getattr(self, '{f}', None))"
+        ]
+    decoder += [
+        "    for key in dictionary.keys() - KNOWN_KEYS: # keys not declared (older saves) take the generic path ",
+        "        setattr(self, key, self._deserialize(dictionary[key], getattr(self, key, None)))"
+    ]
+    namespace = {"SCALAR_TYPES": SCALAR_TYPES, "Serializable": Serializable, "_MISSING": _MISSING, "KNOWN_KEYS": frozenset(fields + ["class_name"])}
+    exec("\n".join(encoder) + "\n" + "\n".join(decoder), namespace)
+    return namespace["_fast_to_dict"], namespace["_fast_from_dict"]
+
 class Serializable:
     """
     WARNING !!! This class could cause infinite saving process for cross referencing Serializables. Make sure only one class save the property. (oZumbiAnalitico) 
@@ -33,6 +73,10 @@ class Serializable:
         - Thread-safe file saving with atomic writes via temporary files.
         - Support for nested Serializable instances.
         - Custom handling of compound data types: tuples, sets, frozensets, lists, and dicts.
+        - Classes defining `__restore__` in their own body are rebuilt by `_deserialize` without 
+          running `__init__` (see `Serializable.allocate`).
+        - Classes declaring `__serialize_only__` get a to_dict/from_dict pair generated once 
+          by `__init_subclass__`, scalar fields skip the generic type dispatch.
 
     Usage:
         Subclass `Serializable` and optionally define:
@@ -66,20 +110,20 @@ class Serializable:
     --- Documentation generated with the assistance of ChatGPT (OpenAI).
     """
     
+    __slots__ = () # subclasses may declare __slots__, the instances have no __dict__ if every base does 
     _registry = {}
     _registry_lock = threading.Lock()
     _file_locks = defaultdict(threading.Lock)
+    _serialize_keys = None # frozenset of __serialize_only__ shared by the instances, per class 
+    _fast_to_dict = None # generated per class by __init_subclass__ 
+    _fast_from_dict = None 
+    # class_name, _explicit_keys and _ignored_keys are class attributes set by __init_subclass__, 
+    # set_serialized_keys and set_ignored_keys override them per instance (not on classes with __slots__)
+    class_name = "Serializable"
+    _ignored_keys = frozenset(("_ignored_keys", "class_name"))
     
     def __init__(self):
-        self.class_name = self.__class__.__name__  # Auto-assign based on class
-        # Use class-declared serialization preferences if available
-        if hasattr(self.__class__, "__serialize_only__"):
-            self._explicit_keys = set(self.__class__.__serialize_only__)
-            self._ignored_keys = set()
-        else:
-            self._ignored_keys = {"_ignored_keys", "class_name"}
-            if hasattr(self.__class__, "__ignore_serialize__"):
-                self._ignored_keys |= set(self.__class__.__ignore_serialize__)
+        pass 
         
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -89,9 +133,38 @@ class Serializable:
             )
         with Serializable._registry_lock:
             Serializable._registry[cls.__name__] = cls
+        cls.class_name = cls.__name__
+        if hasattr(cls, "__serialize_only__"):
+            cls._serialize_keys = frozenset(cls.__serialize_only__)
+            cls._explicit_keys = cls._serialize_keys 
+            cls._ignored_keys = frozenset()
+            cls._fast_to_dict, cls._fast_from_dict = _Build_Fast_Codecs(cls)
+        else:
+            cls._ignored_keys = Serializable._ignored_keys | frozenset(getattr(cls, "__ignore_serialize__", ()))
+    
+    @classmethod
+    def allocate(cls):
+        """ return a new instance ready for from_dict. 
+        Classes defining __restore__ in their own body are allocated with __new__ and __restore__() sets the transient fields 
+        and the defaults of the fields which to_dict may omit (None values), the other classes run cls(). """
+        if not "__restore__" in cls.__dict__: return cls()
+        obj = cls.__new__(cls)
+        obj.__restore__()
+        return obj 
+    
+    @classmethod
+    def restore(cls, dictionary):
+        """ return a new instance loaded from dictionary """
+        obj = cls.allocate()
+        obj.from_dict(dictionary)
+        return obj 
+    
+    def uses_fast_codecs(self):
+        """ the generated codecs are valid while the instance keeps the keys declared by its class """
+        return self._fast_to_dict is not None and getattr(self, "_explicit_keys", None) is self.__class__._serialize_keys
     
     def to_dict(self):
-        T1 = tic()
+        if self.uses_fast_codecs(): return self._fast_to_dict()
         data = {"class_name": self.class_name}
         
         keys_to_serialize = getattr(self, "_explicit_keys", None)
@@ -112,13 +185,15 @@ class Serializable:
                 data[key] = value.to_dict()
             else:
                 data[key] = local_serialize(value)
-        toc(T1, "Serializable.to_dict() ||")        
         return data
     
     def from_dict(self, dictionary):
         if dictionary.get("class_name") != self.class_name:
             print(f"Warning: class mismatch ({dictionary.get('class_name')} != {self.class_name})")
             return False
+        if self.uses_fast_codecs(): 
+            self._fast_from_dict(dictionary)
+            return True 
         for key, value in dictionary.items():
             if key in self._ignored_keys or key == "class_name":
                 continue
@@ -128,6 +203,20 @@ class Serializable:
         return True
     
     def Save_JSON(self, filename):
+        SAVE_WRITER.cancel(filename) # a queued snapshot is older than this one 
+        T1 = tic()
+        result = Serializable._write_json(filename, self.to_dict())
+        toc(T1, f"Serializable.Save_JSON() || json.dump( Serializable: { self }) ||")
+        return result 
+    
+    def Save_JSON_Async(self, filename, backup = None):
+        """ snapshot with to_dict now, the file is written by SAVE_WRITER in background (and copied to backup afterwards) """
+        SAVE_WRITER.submit(filename, self.to_dict(), backup = backup)
+        return True 
+    
+    @staticmethod
+    def _write_json(filename, data):
+        """ write data to filename through a temporary file and an atomic replace, thread safe per file """
         filename = Path(filename)
         temp_name = None  # ensure it's defined for cleanup
         
@@ -136,9 +225,7 @@ class Serializable:
         with file_lock:
             try:
                 with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8', dir=filename.parent) as tmp_file:
-                    T1 = tic()
-                    json.dump(self.to_dict(), tmp_file, indent=4)
-                    toc(T1, f"Serializable.Save_JSON() || json.dump( Serializable: { self }) ||")
+                    json.dump(data, tmp_file, indent=4)
                     temp_name = tmp_file.name
                 shutil.move(temp_name, filename)  # atomic replace
                 return True
@@ -152,6 +239,7 @@ class Serializable:
                 return False
     
     def Load_JSON(self, filename):
+        SAVE_WRITER.wait_for(filename) # don't read a file with a pending background write 
         if not os.path.exists(filename):
             print(f"File not found: {filename}")
             return False
@@ -195,9 +283,7 @@ class Serializable:
                     cls_name = value.get("class_name")
                     cls = self._get_class_by_name(cls_name)
                     if cls:
-                        obj = cls()
-                        obj.from_dict(value)
-                        return obj
+                        return cls.restore(value)
                     else:
                         print(f"Warning: Unknown class '{cls_name}' during deserialization.")
                         return value
@@ -214,10 +300,10 @@ class Serializable:
 
     def append_ignored_keys(self, *keys):
         """Append one or more keys to the ignored list"""
-        self._ignored_keys.update(keys)
+        self._ignored_keys = self._ignored_keys | set(keys) # copy, the class set is shared 
 
     def set_serialized_keys(self, keys):
-        """Switch from 'ignore mode' to 'explicit allow list'"""
+        """Switch from 'ignore mode' to 'explicit allow list' (the generated codecs are not used anymore by this instance)"""
         self._explicit_keys = set(keys)
         self._ignored_keys = set()  # optional: prevent mixing
 
@@ -235,4 +321,298 @@ class Serializable:
 
     @staticmethod
     def _get_class_by_name(name):
-        return Serializable._registry.get(name, None)
\ No newline at end of file
+        return Serializable._registry.get(name, None)
+
+# SaveWriter.submit() || { SaveWriter._run() } || { Serializable._write_json() }
+# SaveWriter.append() || { SaveWriter._run() } || { SaveWriter._append_lines() }
+class SaveWriter: # background writer of json snapshots and journal lines 
+    """ Writes the snapshots (dicts from to_dict) on a daemon thread, in submission order. 
+    Submitting a file which is still queued replaces its snapshot, so repeated saves of the same file are written once. 
+    Appending to a file which is still queued extends its pending lines, which are written together. 
+    flush() is the barrier to use before quitting or when the save must be on disk (F5). """
+    def __init__(self):
+        self._pending = OrderedDict() # filename -> ("json", data, backup, reset, callbacks), ("append", lines, None, None, callbacks) or ("call", function, None, None, callbacks)
+        self._writing = None # filename being written by the thread 
+        self._condition = threading.Condition()
+        self._thread = None 
+        self.writes = 0
+        self.appends = 0
+        self.coalesced = 0
+        self.errors = 0
+    def submit(self, filename, data, backup = None, reset = None, on_done = None):
+        """ queue a json snapshot, backup is a copy made after the write, reset is a file removed after the write (a journal the snapshot supersedes). 
+        on_done(b_ok) is called on the writer thread once the snapshot is written or failed, not if it is replaced or cancelled before. """
+        filename = str(filename)
+        with self._condition:
+            if filename in self._pending: self.coalesced += 1
+            self._pending[filename] = ("json", data, backup, reset, [on_done] if on_done else [])
+            self._start()
+    def append(self, filename, line, on_done = None):
+        """ queue a line (str without newline) to append to filename, on_done(b_ok) like submit """
+        filename = str(filename)
+        with self._condition:
+            job = self._pending.get(filename, None)
+            if job and job[0] == "append":
+                job[1].append(line)
+                if on_done: job[4].append(on_done)
+                self.coalesced += 1
+            else:
+                self._pending[filename] = ("append", [line], None, None, [on_done] if on_done else [])
+            self._start()
+    def submit_task(self, name, function):
+        """ queue function() -> bool to run on the writer thread, name plays the role of the filename (coalescing, wait_for) """
+        name = str(name)
+        with self._condition:
+            if name in self._pending: self.coalesced += 1
+            self._pending[name] = ("call", function, None, None, [])
+            self._start()
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target = self._run, name = "SaveWriter", daemon = True)
+            self._thread.start()
+        self._condition.notify_all()
+    def cancel(self, filename):
+        """ drop the queued snapshot of filename (not the one being written) """
+        with self._condition:
+            return self._pending.pop(str(filename), None) is not None
+    def is_pending(self, filename):
+        filename = str(filename)
+        with self._condition:
+            return filename in self._pending or self._writing == filename
+    def wait_for(self, filename, timeout = None):
+        """ block until filename has no queued or running write, return False on timeout """
+        filename = str(filename)
+        with self._condition:
+            return self._condition.wait_for(lambda: not (filename in self._pending or self._writing == filename), timeout)
+    def flush(self, timeout = None):
+        """ block until every submitted snapshot is written, return False on timeout """
+        T1 = tic()
+        with self._condition:
+            result = self._condition.wait_for(lambda: not (self._pending or self._writing), timeout)
+        toc(T1, "SaveWriter.flush() ||")
+        return result 
+    def stats(self):
+        with self._condition:
+            return {"pending": len(self._pending), "writes": self.writes, "appends": self.appends, "coalesced": self.coalesced, "errors": self.errors}
+    @staticmethod
+    def _append_lines(filename, lines):
+        with Serializable._file_locks[str(filename)]:
+            with open(filename, 'a', encoding='utf-8') as f:
+                f.write("".join(line + "\n" for line in lines))
+        return True 
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                filename, (kind, data, backup, reset, callbacks) = self._pending.popitem(last = False)
+                self._writing = filename 
+            b_ok = False 
+            try:
+                if kind == "append":
+                    b_ok = SaveWriter._append_lines(filename, data)
+                elif kind == "call":
+                    b_ok = data()
+                else:
+                    b_ok = Serializable._write_json(filename, data)
+                    if b_ok and backup: shutil.copy(filename, backup)
+                    if b_ok and reset:
+                        with Serializable._file_locks[str(reset)]:
+                            if os.path.exists(reset): os.remove(reset)
+            except Exception as e:
+                print(f"SaveWriter: error writing {filename}: {e}")
+                b_ok = False 
+            with self._condition:
+                self._writing = None 
+                if kind == "append": self.appends += 1 
+                else: self.writes += 1
+                if not b_ok: self.errors += 1
+                self._condition.notify_all()
+            for on_done in callbacks:
+                try:
+                    on_done(b_ok)
+                except Exception as e:
+                    print(f"SaveWriter: error in the callback of {filename}: {e}")
+
+SAVE_WRITER = SaveWriter()
+
+class SlotStore: # one sqlite database per save slot 
+    """ Maps keyed by coords, the player state and the journals of a save slot in a single sqlite3 file. 
+    put_*() stage the rows (the payloads are compressed json), commit() writes the staged rows in one transaction on SAVE_WRITER, 
+    get_*() read the staged rows first so a load right after a save doesn't wait for the writer. """
+    _stores = {}
+    _stores_lock = threading.Lock()
+    @staticmethod
+    def Open(path):
+        """ the shared store of the database file path """
+        path = str(path)
+        with SlotStore._stores_lock:
+            store = SlotStore._stores.get(path, None)
+            if store is None:
+                store = SlotStore(path)
+                SlotStore._stores[path] = store 
+            return store 
+    def __init__(self, path, compression = 6):
+        self.path = str(path)
+        self.compression = compression
+        self._lock = threading.Lock() # the connection is shared by the game and the writer thread 
+        self._staged = OrderedDict() # (table, key) -> payload 
+        folder = os.path.dirname(self.path)
+        if folder: os.makedirs(folder, exist_ok = True)
+        self._connection = sqlite3.connect(self.path, check_same_thread = False, isolation_level = None)
+        with self._lock:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS maps (x INTEGER, y INTEGER, z INTEGER, data BLOB NOT NULL, PRIMARY KEY (x, y, z))")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS journals (name TEXT PRIMARY KEY, text TEXT NOT NULL)")
+    def _encode(self, data):
+        return zlib.compress(json.dumps(data, separators = (",", ":")).encode("utf-8"), self.compression)
+    @staticmethod
+    def _decode(blob):
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+    def _stage(self, table, key, payload):
+        with self._lock:
+            self._staged.pop((table, key), None)
+            self._staged[(table, key)] = payload 
+    def _get_staged(self, table, key):
+        with self._lock:
+            return self._staged.get((table, key), None)
+    def put_map(self, coords, data):
+        self._stage("maps", tuple(coords), self._encode(data))
+    def put_player(self, data):
+        self.put_state("player", data)
+    def put_state(self, name, data):
+        self._stage("state", name, self._encode(data))
+    def put_journal(self, name, text):
+        self._stage("journals", name, text)
+    def get_map(self, coords):
+        """ the dict of the map, None if it was never saved """
+        coords = tuple(coords)
+        blob = self._get_staged("maps", coords)
+        if blob is None: blob = self._select("SELECT data FROM maps WHERE x=? AND y=? AND z=?", coords)
+        return None if blob is None else SlotStore._decode(blob)
+    def has_map(self, coords):
+        coords = tuple(coords)
+        return self._get_staged("maps", coords) is not None or self._select("SELECT 1 FROM maps WHERE x=? AND y=? AND z=?", coords) is not None
+    def get_player(self):
+        return self.get_state("player")
+    def get_state(self, name):
+        blob = self._get_staged("state", name)
+        if blob is None: blob = self._select("SELECT data FROM state WHERE name=?", (name,))
+        return None if blob is None else SlotStore._decode(blob)
+    def get_journal(self, name):
+        text = self._get_staged("journals", name)
+        return text if text is not None else self._select("SELECT text FROM journals WHERE name=?", (name,))
+    def _select(self, query, parameters):
+        with self._lock:
+            row = self._connection.execute(query, parameters).fetchone()
+        return None if row is None else row[0]
+    def commit(self, b_wait = False):
+        """ write the staged rows in background, in a single transaction """
+        SAVE_WRITER.submit_task(self.path, self._write_pending)
+        if b_wait: SAVE_WRITER.wait_for(self.path)
+    def _write_pending(self):
+        with self._lock:
+            staged, self._staged = self._staged, OrderedDict()
+            if not staged: return True 
+            try:
+                with self._connection: # BEGIN ... COMMIT, ROLLBACK on error 
+                    self._connection.execute("BEGIN")
+                    for (table, key), payload in staged.items():
+                        if table == "maps":
+                            self._connection.execute("INSERT OR REPLACE INTO maps (x, y, z, data) VALUES (?, ?, ?, ?)", (*key, payload))
+                        elif table == "state":
+                            self._connection.execute("INSERT OR REPLACE INTO state (name, data) VALUES (?, ?)", (key, payload))
+                        else:
+                            self._connection.execute("INSERT OR REPLACE INTO journals (name, text) VALUES (?, ?)", (key, payload))
+                return True 
+            except sqlite3.Error as e:
+                print(f"SlotStore: error writing {self.path}: {e}")
+                staged.update(self._staged) # keep the rows for the next commit, newer stages win 
+                self._staged = staged 
+                return False 
+    def stats(self):
+        with self._lock:
+            return {"staged": len(self._staged), "maps": self._connection.execute("SELECT COUNT(*) FROM maps").fetchone()[0], "bytes": os.path.getsize(self.path)}
+
+class SaveContainer: # binary save file with independently compressed json sections 
+    """ Layout : header (magic, version, section count), table of contents (name, offset, length, raw length) per section, 
+    then the zlib compressed json of each section. The file is read through mmap and only the requested sections are decompressed. 
+        SaveContainer.Write("map.sav", {"metadata": {...}, "grid": {...}})
+        with SaveContainer("map.sav") as container: container.read("metadata") """
+    MAGIC = b"QRLS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHH") # magic, version, section count 
+    ENTRY = struct.Struct("<16sQQQ") # name, offset, compressed length, raw length 
+    @staticmethod
+    def Write(filename, sections, compression = 6):
+        """ write the dict name -> json-able value atomically (temporary file then replace), thread safe per file """
+        filename = Path(filename)
+        blobs = []
+        for name, value in sections.items():
+            raw = json.dumps(value, separators = (",", ":")).encode("utf-8")
+            blobs.append((name.encode("utf-8"), zlib.compress(raw, compression), len(raw)))
+        offset = SaveContainer.HEADER.size + SaveContainer.ENTRY.size*len(blobs)
+        toc = []
+        for name, blob, raw_length in blobs:
+            toc.append(SaveContainer.ENTRY.pack(name, offset, len(blob), raw_length))
+            offset += len(blob)
+        temp_name = None 
+        with Serializable._file_locks[str(filename)]:
+            try:
+                with tempfile.NamedTemporaryFile('wb', delete=False, dir=filename.parent) as tmp_file:
+                    temp_name = tmp_file.name
+                    tmp_file.write(SaveContainer.HEADER.pack(SaveContainer.MAGIC, SaveContainer.VERSION, len(blobs)))
+                    tmp_file.write(b"".join(toc))
+                    for _, blob, _ in blobs: tmp_file.write(blob)
+                shutil.move(temp_name, filename)
+                return True 
+            except Exception as e:
+                print(f"Error saving container to {filename}: {e}")
+                if temp_name and os.path.exists(temp_name): os.remove(temp_name)
+                return False 
+    @staticmethod
+    def Is_Valid(filename):
+        """ True if filename exists and starts with a container header, reads only the header """
+        try:
+            with open(filename, 'rb') as f:
+                header = f.read(SaveContainer.HEADER.size)
+            return len(header) == SaveContainer.HEADER.size and SaveContainer.HEADER.unpack(header)[0] == SaveContainer.MAGIC
+        except OSError:
+            return False 
+    def __init__(self, filename):
+        self.filename = str(filename)
+        self._file = open(self.filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+            magic, version, count = SaveContainer.HEADER.unpack_from(self._map, 0)
+            if magic != SaveContainer.MAGIC: raise ValueError(f"{self.filename} is not a save container")
+            if version > SaveContainer.VERSION: raise ValueError(f"{self.filename} has the unsupported version {version}")
+            self.sections = {}
+            for i in range(count):
+                name, offset, length, raw_length = SaveContainer.ENTRY.unpack_from(self._map, SaveContainer.HEADER.size + i*SaveContainer.ENTRY.size)
+                self.sections[name.rstrip(b"\0").decode("utf-8")] = (offset, length, raw_length)
+        except Exception:
+            self.close()
+            raise 
+    def __enter__(self):
+        return self 
+    def __exit__(self, *exc):
+        self.close()
+    def close(self):
+        if getattr(self, "_map", None) is not None: self._map.close()
+        self._map = None 
+        self._file.close()
+    def names(self):
+        return list(self.sections.keys())
+    def has(self, name):
+        return name in self.sections
+    def read(self, name, default = None):
+        """ decompress and parse a single section """
+        entry = self.sections.get(name, None)
+        if entry is None: return default 
+        offset, length, raw_length = entry
+        return json.loads(zlib.decompress(self._map[offset:offset + length], bufsize = max(raw_length, 1)).decode("utf-8"))
+    def read_all(self):
+        return { name: self.read(name) for name in self.sections }
+    def Export_JSON(self, filename):
+        """ debugging export of every section in a single indented json file """
+        return Serializable._write_json(filename, self.read_all())
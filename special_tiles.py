@@ -166,7 +166,7 @@ class TileBuilding(ActionTile): # interface class
             enemy = map.generate_enemy_by_chance_by_list_at(self.x, self.y, self.enemy_table)
             if enemy:
                 self.villagers -= 5
-                map.enemies.append(enemy)
+                map.add_enemy(enemy)
                 map.place_character(enemy)
         else:
             self.b_enemy = False 